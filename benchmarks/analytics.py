@@ -0,0 +1,74 @@
+"""
+Revenue rollup benchmark for the Flask stack
+
+Feeds synthetic orders spread over a year into the rollups, then reports insert
+cost and ``/api/stats/revenue`` query latency for typical dashboard ranges.
+
+Usage:
+    python benchmarks/analytics.py [--orders 2000000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'python-flask', 'app'))
+
+from analytics import RevenueRollup  # noqa: E402
+
+STATUSES = ['pending', 'processing', 'shipped', 'completed', 'cancelled']
+YEAR = 365 * 86400
+EPOCH = 1704067200  # 2024-01-01T00:00:00Z
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--orders', type=int, default=2_000_000, help='orders to roll up')
+    parser.add_argument('--queries', type=int, default=200, help='queries per range')
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    rollup = RevenueRollup()
+    # Orders arrive roughly in time order, as they would in production
+    timestamps = sorted(EPOCH + rng.random() * YEAR for _ in range(args.orders))
+    start = time.perf_counter()
+    for order_id, timestamp in enumerate(timestamps, 1):
+        rollup.add(order_id, timestamp, rng.choice(STATUSES), round(rng.uniform(5, 2000), 2))
+    elapsed = time.perf_counter() - start
+    print(f"rolled up {args.orders:,} orders in {elapsed:.1f} s ({elapsed / args.orders * 1e6:.2f} us/insert)\n")
+
+    ranges = {
+        'last 24h by hour': (86400, 'hour'),
+        'last 7d by hour': (7 * 86400, 'hour'),
+        'last 30d by day': (30 * 86400, 'day'),
+        'full year by day': (YEAR, 'day'),
+    }
+    print(f"{'range':<18} {'p50 ms':>9} {'p99 ms':>9} {'buckets':>8}")
+    for label, (width, granularity) in ranges.items():
+        timings = []
+        for _ in range(args.queries):
+            end = EPOCH + width + rng.random() * (YEAR - width)
+            begin = time.perf_counter()
+            result = rollup.query(end - width, end, granularity)
+            timings.append((time.perf_counter() - begin) * 1000)
+        print(f"{label:<18} {percentile(timings, 0.5):>9.3f} {percentile(timings, 0.99):>9.3f} "
+              f"{len(result['buckets']):>8}")
+
+    timings = []
+    for _ in range(args.queries):
+        end = EPOCH + 3600 + rng.random() * (YEAR - 3600)
+        begin = time.perf_counter()
+        rollup.order_ids_between(end - 3600, end)
+        timings.append((time.perf_counter() - begin) * 1000)
+    print(f"{'1h order scan':<18} {percentile(timings, 0.5):>9.3f} {percentile(timings, 0.99):>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
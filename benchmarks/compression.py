@@ -0,0 +1,90 @@
+"""
+Compression benchmark for the Flask stack
+
+Builds a large ``/api/orders`` response (orders with nested user/product) through the
+Flask app, then reports, per content coding and level, the CPU cost of compressing it
+against the bytes saved, and what the precompressed payload cache buys on repeat requests.
+
+Usage:
+    python benchmarks/compression.py [--orders 5000] [--repeat 20]
+"""
+import argparse
+import gzip
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'python-flask', 'app'))
+
+# Repeat requests from one client would otherwise be timing 429s; keep log lines out of the table
+os.environ['RATE_LIMIT_ENABLED'] = 'false'
+os.environ['ACCESS_LOG_ENABLED'] = 'false'
+
+import app as flask_app  # noqa: E402
+from compression import brotli, zstandard  # noqa: E402
+
+
+def codecs():
+    """Yield (label, compress callable) for every codec/level combination available"""
+    for level in (1, 6, 9):
+        yield f'gzip-{level}', lambda data, level=level: gzip.compress(data, compresslevel=level, mtime=0)
+    if brotli is not None:
+        for quality in (1, 5, 11):
+            yield f'br-{quality}', lambda data, quality=quality: brotli.compress(data, quality=quality)
+    if zstandard is not None:
+        for level in (1, 3, 9):
+            yield f'zstd-{level}', lambda data, level=level: zstandard.ZstdCompressor(level=level).compress(data)
+
+
+def build_payload(order_count):
+    """Grow the sample orders and render them through the real endpoint"""
+    seed = list(flask_app.orders)
+    flask_app.orders[:] = [
+        {**seed[i % len(seed)], 'id': i + 1} for i in range(order_count)
+    ]
+    flask_app.payload_cache.invalidate()
+    with flask_app.app.test_client() as client:
+        return client.get('/api/orders').get_data()
+
+
+def cpu_time(func, data, repeat):
+    """Average CPU seconds per call"""
+    start = time.process_time()
+    for _ in range(repeat):
+        result = func(data)
+    return (time.process_time() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--orders', type=int, default=5000, help='orders in the response')
+    parser.add_argument('--repeat', type=int, default=20, help='compressions per codec')
+    args = parser.parse_args()
+
+    body = build_payload(args.orders)
+    print(f"/api/orders with {args.orders} orders: {len(body):,} bytes uncompressed\n")
+    print(f"{'codec':<9} {'bytes':>11} {'ratio':>7} {'saved':>11} {'cpu ms':>9} {'MB/s':>8} {'us/KB saved':>12}")
+    for label, func in codecs():
+        seconds, compressed = cpu_time(func, body, args.repeat)
+        saved = len(body) - len(compressed)
+        print(f"{label:<9} {len(compressed):>11,} {len(body) / len(compressed):>6.1f}x {saved:>11,} "
+              f"{seconds * 1000:>9.2f} {len(body) / seconds / 1e6 if seconds else float('inf'):>8.1f} "
+              f"{seconds * 1e6 / (saved / 1024) if saved > 0 else float('inf'):>12.2f}")
+
+    # Repeat requests: compression happens once per cache generation, not once per request
+    with flask_app.app.test_client() as client:
+        headers = {'Accept-Encoding': 'gzip'}
+        flask_app.payload_cache.invalidate()
+        start = time.perf_counter()
+        client.get('/api/orders', headers=headers)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            client.get('/api/orders', headers=headers)
+        warm = (time.perf_counter() - start) / args.repeat
+    print(f"\npayload cache (gzip): first request {cold * 1000:.2f} ms, cached {warm * 1000:.2f} ms per request")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Flask vs Django latency benchmark over the shared contract scenarios
+
+Runs every scenario in tests/contract.py against both apps' WSGI callables
+in-process (no server or network) and reports per-endpoint latency side by side.
+With --max-ratio, exits non-zero when one stack's p50 for a scenario is more than
+that many times the other's.
+
+Usage:
+    python benchmarks/parity.py [--requests 500] [--budget 2.0] [--max-ratio 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+import contract  # noqa: E402
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def measure(application, request, scenario, requests, budget):
+    """Latencies in ms for up to ``requests`` calls, stopping early after ``budget`` seconds"""
+    contract.run(application, request, scenario)
+    timings = []
+    deadline = time.perf_counter() + budget
+    while len(timings) < requests and time.perf_counter() < deadline:
+        timings.append(contract.run(application, request, scenario)[2])
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=500, help='requests per scenario and stack')
+    parser.add_argument('--budget', type=float, default=2.0, help='seconds per scenario and stack at most')
+    parser.add_argument('--max-ratio', type=float, default=None,
+                        help='fail when either stack is this many times slower than the other (p50)')
+    parser.add_argument('scenarios', nargs='*', help='scenario names to run (default: all)')
+    args = parser.parse_args()
+
+    apps = {"flask": contract.load_flask(), "django": contract.load_django()}
+    selected = [s for s in contract.SCENARIOS if not args.scenarios or s.name in args.scenarios]
+
+    print(f"{'scenario':<28} {'flask p50':>10} {'p99':>8} {'django p50':>11} {'p99':>8} {'ratio':>7}")
+    regressions = []
+    for scenario in selected:
+        flask = measure(apps['flask'], scenario.flask_request(), scenario, args.requests, args.budget)
+        django = measure(apps['django'], scenario.django_request(), scenario, args.requests, args.budget)
+        flask_p50, django_p50 = percentile(flask, 0.5), percentile(django, 0.5)
+        # >1 means Django is slower
+        ratio = django_p50 / flask_p50 if flask_p50 else float('inf')
+        print(f"{scenario.name:<28} {flask_p50:>10.3f} {percentile(flask, 0.99):>8.3f} "
+              f"{django_p50:>11.3f} {percentile(django, 0.99):>8.3f} {ratio:>6.2f}x")
+        if args.max_ratio and max(ratio, 1 / ratio if ratio else float('inf')) > args.max_ratio:
+            regressions.append(scenario.name)
+
+    if regressions:
+        print(f"\n{len(regressions)} scenario(s) beyond {args.max_ratio}x: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Search benchmark for the Flask stack
+
+Builds the product search index over synthetic products and reports build time,
+incremental write cost and ``q=`` query latency percentiles.
+
+Usage:
+    python benchmarks/search.py [--rows 1000000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'python-flask', 'app'))
+
+from search import SearchIndex  # noqa: E402
+
+CATEGORIES = ['Electronics', 'Education', 'Furniture', 'Garden', 'Toys', 'Sports', 'Kitchen', 'Books']
+ADJECTIVES = ['wireless', 'ergonomic', 'compact', 'premium', 'portable', 'smart', 'classic', 'deluxe',
+              'modular', 'rugged', 'silent', 'adjustable', 'vintage', 'organic', 'foldable', 'digital']
+NOUNS = ['laptop', 'keyboard', 'chair', 'desk', 'lamp', 'headphones', 'monitor', 'speaker', 'backpack',
+         'kettle', 'blender', 'tent', 'racket', 'puzzle', 'notebook', 'camera', 'router', 'drone']
+
+
+def make_product(product_id, rng):
+    """Synthetic product with a realistic long tail of name tokens"""
+    noun = rng.choice(NOUNS)
+    name = f"{rng.choice(ADJECTIVES)} {noun} {rng.choice(ADJECTIVES)} {noun}{rng.randrange(1000)}"
+    return {
+        'id': product_id,
+        'name': name,
+        'category': rng.choice(CATEGORIES),
+        'description': f"A {rng.choice(ADJECTIVES)} {noun} for everyday use",
+    }
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='products to index')
+    parser.add_argument('--queries', type=int, default=200, help='queries per query shape')
+    parser.add_argument('--limit', type=int, default=20, help='results per query (like ?limit=)')
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    index = SearchIndex({'name': 3, 'category': 2, 'description': 1})
+    start = time.perf_counter()
+    for product_id in range(1, args.rows + 1):
+        index.add(product_id, make_product(product_id, rng))
+    build = time.perf_counter() - start
+    print(f"indexed {args.rows:,} products in {build:.1f} s "
+          f"({build / args.rows * 1e6:.1f} us/row, {len(index.terms):,} terms)")
+
+    start = time.perf_counter()
+    for product_id in range(args.rows + 1, args.rows + 1001):
+        index.add(product_id, make_product(product_id, rng))
+    print(f"incremental insert: {(time.perf_counter() - start) / 1000 * 1e6:.1f} us/row")
+
+    shapes = {
+        'rare term': lambda: f"{rng.choice(NOUNS)}{rng.randrange(1000)}",
+        'common term': lambda: rng.choice(NOUNS),
+        'two terms': lambda: f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}",
+        'prefix': lambda: rng.choice(NOUNS)[:3],
+        'term + prefix': lambda: f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)[:4]}",
+    }
+    print(f"\n{'query shape':<14} {'p50 ms':>9} {'p99 ms':>9} {'mean hits':>11}")
+    for label, make_query in shapes.items():
+        timings, hits = [], []
+        for _ in range(args.queries):
+            query = make_query()
+            start = time.perf_counter()
+            results = index.search(query, args.limit)
+            timings.append((time.perf_counter() - start) * 1000)
+            hits.append(len(results))
+        print(f"{label:<14} {percentile(timings, 0.5):>9.3f} {percentile(timings, 0.99):>9.3f} "
+              f"{statistics.mean(hits):>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Dataset snapshot benchmark for the Flask stack
+
+Fills the Flask app's users/products/orders with synthetic rows, then compares
+rebuilding every index from the lists against restoring lists and indexes from
+a memory-mapped snapshot, reported per million rows.
+
+Usage:
+    python benchmarks/snapshot.py [--rows 1000000] [--dir /tmp/snapshot-bench]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'python-flask', 'app'))
+
+# Keep the import from loading or writing the real snapshot
+os.environ['SNAPSHOT_ENABLED'] = 'false'
+os.environ.setdefault('SNAPSHOT_KEY', 'benchmark')
+
+import app  # noqa: E402
+
+WORDS = ['laptop', 'phone', 'chair', 'desk', 'book', 'lamp', 'monitor', 'cable', 'camera', 'speaker',
+         'keyboard', 'mouse', 'tablet', 'watch', 'bag', 'bottle', 'pen', 'notebook', 'sofa', 'table']
+CATEGORIES = ['Electronics', 'Education', 'Furniture', 'Office', 'Home', 'Outdoors']
+FIRST = ['alice', 'bob', 'carol', 'david', 'erin', 'frank', 'grace', 'heidi', 'ivan', 'judy']
+STATUSES = ['pending', 'processing', 'shipped', 'completed', 'cancelled']
+EPOCH = 1704067200  # 2024-01-01T00:00:00Z
+
+
+def generate(rows, rng):
+    """One third each of users, products and orders"""
+    count = max(1, rows // 3)
+    users = [
+        {"id": i, "name": f"{rng.choice(FIRST).title()} {rng.choice(WORDS).title()}{i % 997}",
+         "email": f"user{i}@example.com", "role": rng.choice(['admin', 'user', 'moderator'])}
+        for i in range(1, count + 1)
+    ]
+    products = [
+        {"id": i, "name": f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i % 1009}",
+         "price": round(rng.uniform(1, 2000), 2), "category": rng.choice(CATEGORIES),
+         "inStock": rng.random() < 0.8}
+        for i in range(1, count + 1)
+    ]
+    timestamps = sorted(EPOCH + rng.random() * 365 * 86400 for _ in range(count))
+    orders = [
+        {"id": i, "userId": rng.randint(1, count), "productId": rng.randint(1, count),
+         "quantity": rng.randint(1, 5), "total": round(rng.uniform(5, 2000), 2),
+         "status": rng.choice(STATUSES), "createdAt": app.format_timestamp(timestamp)}
+        for i, timestamp in enumerate(timestamps, 1)
+    ]
+    return users, products, orders
+
+
+def timed(label, rows, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:>8.2f} s {elapsed / rows * 1e6:>8.2f} s/M rows")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='total rows across users, products and orders')
+    parser.add_argument('--dir', default=None, help='directory for the snapshot file (default: a temp dir)')
+    args = parser.parse_args()
+    rng = random.Random(11)
+
+    users, products, orders = generate(args.rows, rng)
+    rows = len(users) + len(products) + len(orders)
+    app.users[:], app.products[:], app.orders[:] = users, products, orders
+    directory = args.dir or tempfile.mkdtemp(prefix='snapshot-bench-')
+    path = os.path.join(directory, 'dataset.snapshot')
+    print(f"{rows:,} rows, snapshot at {path}\n")
+
+    rebuild = timed('rebuild indexes from lists', rows, app.rebuild_indexes)
+    timed('write snapshot', rows, lambda: app.save_snapshot(path))
+    print(f"{'snapshot size':<28} {os.path.getsize(path) / 1e6:>8.1f} MB")
+
+    # Start from empty structures, as a freshly started worker would
+    app.users.clear()
+    app.products.clear()
+    app.orders.clear()
+    app.rebuild_indexes()
+    restore = timed('restore lists and indexes', rows, lambda: app.restore_snapshot(path))
+    assert len(app.users) + len(app.products) + len(app.orders) == rows
+    print(f"\nrestore is {rebuild / restore:.1f}x faster than rebuilding")
+
+
+if __name__ == '__main__':
+    main()
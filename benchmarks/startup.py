@@ -0,0 +1,109 @@
+"""
+Startup benchmark for the Flask and Django stacks
+
+Spawns a fresh interpreter per stack under ``python -X importtime``, imports the
+WSGI callable, and drives internal ``GET /livez`` requests until the first 200.
+Reports import time, time to first successful ``/livez`` and the slowest imports.
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--top 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STACKS = {
+    'flask': {
+        'cwd': os.path.join(ROOT, 'python-flask', 'app'),
+        'module': 'app',
+        'callable': 'app',
+        'env': {},
+    },
+    'django': {
+        'cwd': os.path.join(ROOT, 'django', 'app'),
+        'module': 'djangoapp.wsgi',
+        'callable': 'application',
+        'env': {'DJANGO_SETTINGS_MODULE': 'djangoapp.settings'},
+    },
+}
+
+# Runs inside the child interpreter; prints a single JSON line on stdout
+PROBE = '''
+import importlib, io, json, sys, time
+t0 = time.perf_counter()
+module = importlib.import_module({module!r})
+application = getattr(module, {callable!r})
+t1 = time.perf_counter()
+status = []
+def start_response(s, headers, exc_info=None):
+    status.append(s)
+environ = {{
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': '/livez', 'QUERY_STRING': '',
+    'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+    'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(),
+    'wsgi.errors': sys.stderr, 'wsgi.multithread': False, 'wsgi.multiprocess': True,
+    'wsgi.run_once': False,
+}}
+while True:
+    del status[:]
+    body = b''.join(application(dict(environ), start_response))
+    if status and status[0].startswith('200'):
+        break
+t2 = time.perf_counter()
+print(json.dumps({{'import_ms': (t1 - t0) * 1000, 'first_livez_ms': (t2 - t0) * 1000}}))
+'''
+
+
+def parse_importtime(stderr):
+    """Return (cumulative_us, module) pairs from ``-X importtime`` output"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, rest = line.split(':', 1)
+        _, cumulative_us, name = rest.split('|', 2)
+        entries.append((int(cumulative_us), name.strip()))
+    return entries
+
+
+def run_once(stack):
+    """Start a fresh interpreter for ``stack`` and return its timings and import profile"""
+    config = STACKS[stack]
+    env = dict(os.environ, **config['env'])
+    probe = PROBE.format(module=config['module'], callable=config['callable'])
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', probe],
+        cwd=config['cwd'], env=env, capture_output=True, text=True, check=True,
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return timings, parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per stack')
+    parser.add_argument('--top', type=int, default=10, help='slowest imports to list')
+    parser.add_argument('--stack', choices=sorted(STACKS), action='append', help='limit to one stack')
+    args = parser.parse_args()
+
+    for stack in args.stack or sorted(STACKS):
+        imports, firsts, profile = [], [], []
+        for _ in range(args.runs):
+            timings, profile = run_once(stack)
+            imports.append(timings['import_ms'])
+            firsts.append(timings['first_livez_ms'])
+        print(f"\n{stack}")
+        print(f"  import app          median {statistics.median(imports):8.1f} ms  (min {min(imports):.1f})")
+        print(f"  first 200 /livez    median {statistics.median(firsts):8.1f} ms  (min {min(firsts):.1f})")
+        print("  slowest imports (cumulative, last run):")
+        for cumulative_us, name in sorted(profile, reverse=True)[:args.top]:
+            print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Structured JSON access logging through a background queue for Django Docker app
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+ACCESS_LOG_ENABLED = os.environ.get('ACCESS_LOG_ENABLED', 'true').lower() == 'true'
+# Fraction of fast, successful requests that are logged; errors and slow requests always are
+ACCESS_LOG_SAMPLE_RATE = float(os.environ.get('ACCESS_LOG_SAMPLE_RATE', 0.1))
+ACCESS_LOG_SLOW_MS = float(os.environ.get('ACCESS_LOG_SLOW_MS', 500))
+# Records waiting for the writer thread; beyond this they are dropped rather than blocking requests
+ACCESS_LOG_QUEUE_SIZE = int(os.environ.get('ACCESS_LOG_QUEUE_SIZE', 10000))
+
+
+def log_reason(status: int, duration_ms: float, sample_rate: float = ACCESS_LOG_SAMPLE_RATE) -> Optional[str]:
+    """Why a request should be logged ('error', 'slow' or 'sampled'), or None to skip it"""
+    if status >= 400:
+        return 'error'
+    if duration_ms >= ACCESS_LOG_SLOW_MS:
+        return 'slow'
+    if sample_rate >= 1 or random.random() < sample_rate:
+        return 'sampled'
+    return None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: an access record's fields, or level/logger/message for anything else"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        created = datetime.fromtimestamp(record.created, timezone.utc)
+        entry = {"time": created.isoformat(timespec='milliseconds').replace('+00:00', 'Z')}
+        access = getattr(record, 'access', None)
+        if access is not None:
+            entry.update(access)
+        else:
+            entry.update(level=record.levelname, logger=record.name, message=record.getMessage())
+            if record.exc_info and not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            if record.exc_text:
+                entry['exception'] = record.exc_text
+        return json.dumps(entry, separators=(',', ':'), default=str)
+
+
+class QueuedStreamHandler(logging.handlers.QueueHandler):
+    """Request threads only enqueue records; a QueueListener thread formats and writes them
+
+    The queue is bounded and full queues drop records (counted in ``dropped``), so a slow log
+    sink never adds latency to requests. Formatters set on this handler apply to the writer.
+    """
+
+    def __init__(self, stream=None, queue_size: int = ACCESS_LOG_QUEUE_SIZE):
+        super().__init__(queue.Queue(queue_size))
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.target.setFormatter(JsonFormatter())
+        self.dropped = 0
+        self.listener = logging.handlers.QueueListener(self.queue, self.target)
+        self.listener.start()
+        atexit.register(self.close)
+
+    def setFormatter(self, fmt: Optional[logging.Formatter]) -> None:
+        self.target.setFormatter(fmt)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Access records carry plain values, so formatting is left to the writer thread
+        if hasattr(record, 'access'):
+            return record
+        return super().prepare(record)
+
+    def close(self) -> None:
+        """Flush queued records and stop the writer thread"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+            self.target.close()
+        super().close()
+
+
+def access_log_handler(stream=None, queue_size: int = ACCESS_LOG_QUEUE_SIZE) -> QueuedStreamHandler:
+    """Factory for logging.config (``'()': ...``)
+
+    Naming a QueueHandler subclass under ``'class'`` makes dictConfig on Python 3.12+ require
+    a ``handlers`` list and pass in its own queue, which this handler does not take.
+    """
+    return QueuedStreamHandler(stream, queue_size)
+
+
+def access_logger(name: str = 'access') -> logging.Logger:
+    """The access logger, writing JSON lines through a QueuedStreamHandler"""
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        logger.addHandler(access_log_handler())
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+class AccessLogMiddleware:
+    """Times each request end to end and queues an access record when ``log_reason`` says so"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.logger = logging.getLogger('access')
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        if not ACCESS_LOG_ENABLED:
+            return response
+        duration_ms = (time.perf_counter() - start) * 1000
+        reason = log_reason(response.status_code, duration_ms)
+        if reason is None:
+            return response
+        if response.has_header('Content-Length'):
+            size = int(response['Content-Length'])
+        else:
+            size = None if response.streaming else len(response.content)
+        match = request.resolver_match
+        self.logger.info('access', extra={'access': {
+            "method": request.method,
+            "route": '/' + match.route if match else None,
+            "path": request.path,
+            "status": response.status_code,
+            "durationMs": round(duration_ms, 3),
+            "size": size,
+            "cache": getattr(request, 'cache_status', None),
+            "client": request.META.get('REMOTE_ADDR'),
+            "reason": reason,
+            "sampleRate": ACCESS_LOG_SAMPLE_RATE if reason == 'sampled' else 1
+        }})
+        return response
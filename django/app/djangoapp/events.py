@@ -0,0 +1,196 @@
+"""
+Write-through change feed and Server-Sent Events for Django Docker app
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Iterator, List, Optional, Tuple
+
+# Events kept in memory for Last-Event-ID resumption
+EVENTS_BUFFER_SIZE = int(os.environ.get('EVENTS_BUFFER_SIZE', 1000))
+# Idle streams get a comment line this often so proxies keep them open
+EVENTS_HEARTBEAT_SECONDS = float(os.environ.get('EVENTS_HEARTBEAT_SECONDS', 15))
+# Concurrent streams per worker; each one holds a worker thread
+EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('EVENTS_MAX_SUBSCRIBERS', 4))
+# Optional: fan changes out to every worker through Redis pub/sub (needs the redis package)
+EVENTS_REDIS_URL = os.environ.get('EVENTS_REDIS_URL')
+EVENTS_CHANNEL = os.environ.get('EVENTS_CHANNEL', 'changes')
+
+RESET_FRAME = b'event: reset\ndata: {}\n\n'
+HEARTBEAT_FRAME = b': keep-alive\n\n'
+
+# INCR and PUBLISH in one step, so every worker sees events in id order
+PUBLISH_SCRIPT = """
+local id = redis.call('INCR', KEYS[1])
+redis.call('PUBLISH', ARGV[1], id .. ' ' .. ARGV[2])
+return id
+"""
+
+
+def encode_frame(event_id: int, event_type: str, body: str) -> bytes:
+    """One SSE frame, encoded once and shared by every subscriber"""
+    return f"id: {event_id}\nevent: {event_type}\ndata: {body}\n\n".encode()
+
+
+class ChangeFeed:
+    """Bounded log of data changes that many SSE subscribers can follow and resume from"""
+
+    def __init__(self, size: int = EVENTS_BUFFER_SIZE, redis_url: Optional[str] = EVENTS_REDIS_URL,
+                 channel: str = EVENTS_CHANNEL):
+        self._events: deque = deque(maxlen=size)
+        self._condition = threading.Condition()
+        self.last_id = 0
+        self.subscribers = 0
+        self.channel = channel
+        self._redis_url = redis_url
+        self._redis_error = None
+        self._listener_pid = None
+
+    def publish(self, kind: str, action: str, data: Any) -> None:
+        """Record a change (e.g. order/created) carrying only the changed record"""
+        event_type = f"{kind}.{action}"
+        body = json.dumps({"type": event_type, "data": data}, separators=(',', ':'), default=str)
+        self._ensure_listener()
+        if self._redis_url:
+            try:
+                self._publish_script(keys=[self.channel + ':id'], args=[self.channel, f"{event_type} {body}"])
+            except self._redis_error:
+                # Ids come from Redis; numbering this one locally would break their order, so it is lost
+                pass
+            return
+        with self._condition:
+            self._append(self.last_id + 1, event_type, body)
+
+    def _append(self, event_id: int, event_type: str, body: str) -> None:
+        """Add an event and wake subscribers; the caller holds the condition"""
+        self._events.append((event_id, encode_frame(event_id, event_type, body)))
+        # Events published just before the listener read the counter arrive after it, with lower ids
+        self.last_id = max(self.last_id, event_id)
+        self._condition.notify_all()
+
+    def _collect(self, last_id: int, from_now: bool = False) -> Tuple[List[bytes], int, bool]:
+        """Frames after last_id; the flag is set when events the client missed were already dropped
+
+        A stream that started from now has missed nothing, so it takes whatever arrives next; its
+        starting id may predate the first Redis id this worker sees.
+        """
+        frames = []
+        for event_id, frame in reversed(self._events):
+            if event_id <= last_id:
+                break
+            frames.append(frame)
+        oldest = self._events[0][0] if self._events else self.last_id + 1
+        if not from_now and last_id < min(oldest - 1, self.last_id):
+            return [], self.last_id, True
+        if not frames:
+            return [], last_id, False
+        frames.reverse()
+        return frames, self.last_id, False
+
+    def wait(self, last_id: int, timeout: float, from_now: bool = False) -> Tuple[List[bytes], int, bool]:
+        """Block up to timeout for events after last_id; returns (frames, new last id, gap)"""
+        with self._condition:
+            if last_id > self.last_id and not self._redis_url:
+                # Local ids restart with the worker, so this id is from a previous lifetime
+                return [], self.last_id, True
+            frames, new_last_id, gap = self._collect(last_id, from_now)
+            if frames or gap:
+                return frames, new_last_id, gap
+            self._condition.wait(timeout)
+            return self._collect(last_id, from_now)
+
+    def stream(self, last_id: Optional[int]) -> Iterator[bytes]:
+        """SSE byte stream from last_id (or from now), with heartbeats while idle
+
+        A gap the buffer cannot fill is reported as a ``reset`` event; the client should refetch.
+        """
+        self._ensure_listener()
+        from_now = last_id is None
+        if from_now:
+            last_id = self.last_id
+        yield b'retry: 3000\n\n'
+        while True:
+            frames, last_id, gap = self.wait(last_id, EVENTS_HEARTBEAT_SECONDS, from_now)
+            if gap:
+                yield RESET_FRAME
+            elif frames:
+                from_now = False
+                yield b''.join(frames)
+            else:
+                yield HEARTBEAT_FRAME
+
+    def subscribe(self, last_id: Optional[int]) -> Optional['Subscription']:
+        """Reserve a subscriber slot and return its stream, or None when the worker is full"""
+        with self._condition:
+            if self.subscribers >= EVENTS_MAX_SUBSCRIBERS:
+                return None
+            self.subscribers += 1
+        return Subscription(self, self.stream(last_id))
+
+    def _release(self) -> None:
+        with self._condition:
+            self.subscribers -= 1
+
+    def _ensure_listener(self) -> None:
+        """Start the Redis listener once per process (after gunicorn forks workers)"""
+        if not self._redis_url or self._listener_pid == os.getpid():
+            return
+        with self._condition:
+            if self._listener_pid == os.getpid():
+                return
+            try:
+                # Deferred: a large import that only Redis mode needs
+                import redis
+            except ImportError:
+                self._redis_url = None
+                return
+            self._listener_pid = os.getpid()
+            self._redis_error = redis.RedisError
+            client = redis.Redis.from_url(self._redis_url)
+            self._publish_script = client.register_script(PUBLISH_SCRIPT)
+            threading.Thread(target=self._listen, args=(client,), name='change-feed', daemon=True).start()
+
+    def _listen(self, client) -> None:
+        """Append events published by any worker, reconnecting after Redis errors"""
+        while True:
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Ids come from the shared counter, so start from its value rather than 0 (subscribed
+                # first, so nothing published in between is missed). Events beyond our last id were
+                # missed while disconnected; emptying the buffer makes resuming clients reset.
+                current = int(client.get(self.channel + ':id') or 0)
+                with self._condition:
+                    if current > self.last_id:
+                        self._events.clear()
+                        self.last_id = current
+                        self._condition.notify_all()
+                for message in pubsub.listen():
+                    event_id, event_type, body = message['data'].decode().split(' ', 2)
+                    with self._condition:
+                        self._append(int(event_id), event_type, body)
+            except self._redis_error:
+                time.sleep(1)
+
+
+class Subscription:
+    """A subscriber's SSE stream; closing it (the WSGI server does on disconnect) frees the slot"""
+
+    def __init__(self, feed: ChangeFeed, frames: Iterator[bytes]):
+        self._feed = feed
+        self._frames = frames
+        self._closed = False
+
+    def __iter__(self) -> 'Subscription':
+        return self
+
+    def __next__(self) -> bytes:
+        return next(self._frames)
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._frames.close()
+            self._feed._release()
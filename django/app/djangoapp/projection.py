@@ -0,0 +1,75 @@
+"""
+Field projection (``fields=``) for Django Docker app
+"""
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+Projector = Callable[[Any], Dict[str, Any]]
+
+
+class UnknownFieldError(ValueError):
+    """Raised when a ``fields=`` projection names a field the record type does not have"""
+
+
+def parse_fields(raw: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Split a ``fields=`` value into a de-duplicated tuple, or None for every field"""
+    if raw is None:
+        return None
+    fields = tuple(dict.fromkeys(field.strip() for field in raw.split(',') if field.strip()))
+    return fields or None
+
+
+class Schema:
+    """Projectable fields of a record type: stored fields, derived fields and nested records"""
+
+    def __init__(self, fields: Iterable[str], derived: Optional[Dict[str, Callable]] = None,
+                 nested: Optional[Dict[str, Tuple[Callable, 'Schema']]] = None,
+                 getter: Callable[[str], Callable] = itemgetter):
+        self.fields = tuple(fields)
+        self.derived = derived or {}
+        self.nested = nested or {}
+        self.getter = getter
+        # Projectors are compiled once per distinct field list and reused across requests
+        self.projector = lru_cache(maxsize=128)(self._compile)
+
+    def _compile(self, fields: Optional[Tuple[str, ...]]) -> Projector:
+        """Build a projector for a normalized field tuple; None selects every field"""
+        if fields is None:
+            fields = self.fields + tuple(self.derived) + tuple(self.nested)
+
+        # Dotted names ("user.name") select fields of a nested record
+        selected: Dict[str, Optional[Tuple[str, ...]]] = {}
+        for field in fields:
+            name, _, rest = field.partition('.')
+            if not rest:
+                selected[name] = None
+            elif name not in self.nested:
+                raise UnknownFieldError(f"Unknown field: {field}")
+            elif name not in selected or selected[name] is not None:
+                selected[name] = selected.get(name, ()) + (rest,)
+
+        getters = []
+        for name, subfields in selected.items():
+            if name in self.nested:
+                resolve, schema = self.nested[name]
+                getters.append((name, _nested_getter(resolve, schema.projector(subfields))))
+            elif name in self.derived:
+                getters.append((name, self.derived[name]))
+            elif name in self.fields:
+                getters.append((name, self.getter(name)))
+            else:
+                raise UnknownFieldError(f"Unknown field: {name}")
+        getters = tuple(getters)
+
+        def project(record):
+            return {name: get(record) for name, get in getters}
+        return project
+
+
+def _nested_getter(resolve: Callable, project: Projector) -> Callable:
+    """Resolve a nested record only when it is requested, then project it"""
+    def get(record):
+        child = resolve(record)
+        return None if child is None else project(child)
+    return get
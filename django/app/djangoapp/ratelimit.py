@@ -0,0 +1,211 @@
+"""
+Token-bucket rate limiting and load shedding for Django Docker app
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from django.http import JsonResponse
+
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+# Sustained requests per second and burst size, per client and route
+RATE_LIMIT_RATE = float(os.environ.get('RATE_LIMIT_RATE', 10))
+RATE_LIMIT_BURST = float(os.environ.get('RATE_LIMIT_BURST', 20))
+# Tokens charged for routes marked expensive
+RATE_LIMIT_EXPENSIVE_COST = float(os.environ.get('RATE_LIMIT_EXPENSIVE_COST', 5))
+# Optional: share buckets between workers through Redis (needs the redis package)
+RATE_LIMIT_REDIS_URL = os.environ.get('RATE_LIMIT_REDIS_URL')
+# Take the client address from X-Forwarded-For (only behind a trusted proxy)
+RATE_LIMIT_TRUST_PROXY = os.environ.get('RATE_LIMIT_TRUST_PROXY', 'false').lower() == 'true'
+
+# Expensive routes are shed when this many requests are in flight in the worker (0 disables)
+SHED_MAX_INFLIGHT = int(os.environ.get('SHED_MAX_INFLIGHT', 4))
+# ...or when the request waited longer than this in the proxy/backlog queue (needs X-Request-Start)
+SHED_MAX_QUEUE_MS = float(os.environ.get('SHED_MAX_QUEUE_MS', 1000))
+
+
+class TokenBucketLimiter:
+    """In-process token buckets, one per key, with LRU eviction of idle keys"""
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: 'OrderedDict[str, list]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens; returns 0 when allowed, else seconds until they would be available"""
+        # A single request never costs more than a full bucket
+        cost = min(cost, self.burst)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = self.burst
+            else:
+                tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / self.rate
+            self._buckets[key] = [tokens, now]
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class RedisTokenBucketLimiter:
+    """Token buckets shared by every worker and container through Redis"""
+
+    # Refill and take tokens atomically; returns the wait in seconds as a string
+    SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+    def __init__(self, url: str, rate: float, burst: float, prefix: str = 'ratelimit:'):
+        self.rate = rate
+        self.burst = burst
+        self.prefix = prefix
+        # Deferred: a large import that only Redis mode needs
+        import redis
+        self._redis_error = redis.RedisError
+        self.client = redis.Redis.from_url(url, socket_timeout=0.05)
+        self._script = self.client.register_script(self.SCRIPT)
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens; fails open if Redis is unavailable"""
+        cost = min(cost, self.burst)
+        try:
+            return float(self._script(keys=[self.prefix + key], args=[self.rate, self.burst, cost, time.time()]))
+        except self._redis_error:
+            return 0.0
+
+
+def create_limiter():
+    """Redis-backed limiter when configured and available, otherwise in-process"""
+    if RATE_LIMIT_REDIS_URL:
+        try:
+            return RedisTokenBucketLimiter(RATE_LIMIT_REDIS_URL, RATE_LIMIT_RATE, RATE_LIMIT_BURST)
+        except ImportError:
+            pass
+    return TokenBucketLimiter(RATE_LIMIT_RATE, RATE_LIMIT_BURST)
+
+
+def queue_wait_ms(request_start: Optional[str]) -> float:
+    """Milliseconds since a proxy's ``X-Request-Start`` stamp (``t=<s|ms|us>``), or 0 if absent"""
+    if not request_start:
+        return 0.0
+    try:
+        stamp = float(request_start.strip().lstrip('t='))
+    except ValueError:
+        return 0.0
+    # Normalise seconds, milliseconds or microseconds since the epoch to seconds
+    while stamp > 1e11:
+        stamp /= 1000.0
+    return max(0.0, (time.time() - stamp) * 1000.0)
+
+
+class LoadShedder:
+    """Tracks in-flight requests and decides when expensive work should be refused early"""
+
+    def __init__(self, max_inflight: int = SHED_MAX_INFLIGHT, max_queue_ms: float = SHED_MAX_QUEUE_MS):
+        self.max_inflight = max_inflight
+        self.max_queue_ms = max_queue_ms
+        self.inflight = 0
+        self._lock = threading.Lock()
+
+    def enter(self) -> None:
+        with self._lock:
+            self.inflight += 1
+
+    def leave(self) -> None:
+        with self._lock:
+            self.inflight -= 1
+
+    def should_shed(self, request_start: Optional[str] = None) -> bool:
+        """True when the worker is saturated or the request already queued too long"""
+        if self.max_inflight and self.inflight > self.max_inflight:
+            return True
+        return bool(self.max_queue_ms) and queue_wait_ms(request_start) > self.max_queue_ms
+
+
+# Liveness probes are never limited or shed
+RATE_LIMIT_EXEMPT = {'livez'}
+
+
+def expensive(view):
+    """Mark a view that costs more rate-limit tokens and is shed first under load"""
+    view.expensive = True
+    return view
+
+
+def client_id(request):
+    """Address the rate limiter keys on"""
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if RATE_LIMIT_TRUST_PROXY and forwarded:
+        return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR') or 'unknown'
+
+
+class RateLimitMiddleware:
+    """Reject over-budget clients and shed expensive views before they run"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limiter = create_limiter()
+        self.shedder = LoadShedder()
+
+    def __call__(self, request):
+        if request.path_info == '/livez':
+            return self.get_response(request)
+        self.shedder.enter()
+        try:
+            return self.get_response(request)
+        finally:
+            self.shedder.leave()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        route = request.resolver_match.url_name or request.resolver_match.route
+        if route in RATE_LIMIT_EXEMPT:
+            return None
+
+        is_expensive = getattr(view_func, 'expensive', False)
+        if RATE_LIMIT_ENABLED:
+            cost = RATE_LIMIT_EXPENSIVE_COST if is_expensive else 1
+            wait = self.limiter.acquire(f"{client_id(request)}|{route}", cost)
+            if wait:
+                response = JsonResponse({
+                    "success": False,
+                    "message": "Too many requests"
+                }, status=429)
+                response['Retry-After'] = str(max(1, int(wait + 0.999)))
+                return response
+
+        if is_expensive and self.shedder.should_shed(request.META.get('HTTP_X_REQUEST_START')):
+            response = JsonResponse({
+                "success": False,
+                "message": "Server busy, try again shortly"
+            }, status=503)
+            response['Retry-After'] = '1'
+            return response
+        return None
@@ -0,0 +1,133 @@
+"""
+In-memory full-text and prefix search for Django Docker app
+"""
+import bisect
+import heapq
+import math
+import re
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Terms reached only through prefix expansion score lower than exact matches
+PREFIX_PENALTY = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens of text"""
+    return TOKEN_RE.findall(text.lower())
+
+
+class SearchIndex:
+    """Inverted index plus a sorted term list for prefix matching, updated incrementally on writes"""
+
+    def __init__(self, weights: Mapping[str, float], max_prefix_terms: int = 64):
+        self.weights = dict(weights)
+        self.max_prefix_terms = max_prefix_terms
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.terms: List[str] = []
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def add(self, doc_id: int, record: Mapping[str, Any]) -> None:
+        """Index a record's weighted text fields, replacing any previous version of it"""
+        scores: Dict[str, float] = {}
+        for field, weight in self.weights.items():
+            value = record.get(field)
+            if value:
+                for term in tokenize(str(value)):
+                    scores[term] = scores.get(term, 0.0) + weight
+
+        with self._lock:
+            if doc_id in self._doc_terms:
+                self._remove(doc_id)
+            for term, score in scores.items():
+                posting = self.postings.get(term)
+                if posting is None:
+                    posting = self.postings[term] = {}
+                    bisect.insort(self.terms, term)
+                posting[doc_id] = score
+            self._doc_terms[doc_id] = tuple(scores)
+
+    def remove(self, doc_id: int) -> None:
+        """Drop a record from the index"""
+        with self._lock:
+            self._remove(doc_id)
+
+    def clear(self) -> None:
+        """Drop every record from the index"""
+        with self._lock:
+            self.postings.clear()
+            self.terms.clear()
+            self._doc_terms.clear()
+
+    def _remove(self, doc_id: int) -> None:
+        for term in self._doc_terms.pop(doc_id, ()):
+            posting = self.postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self.postings[term]
+                del self.terms[bisect.bisect_left(self.terms, term)]
+
+    def expand(self, prefix: str) -> List[str]:
+        """Indexed terms starting with prefix, in sorted order, capped at max_prefix_terms"""
+        start = bisect.bisect_left(self.terms, prefix)
+        matches = []
+        for term in self.terms[start:start + self.max_prefix_terms]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Rank records containing every query term; the last term also matches as a prefix
+
+        Each term scores field weight x idf; results are (doc_id, score), best first.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        with self._lock:
+            total = len(self._doc_terms)
+            per_token = []
+            for position, token in enumerate(tokens):
+                if position == len(tokens) - 1:
+                    terms = self.expand(token)
+                else:
+                    terms = [token] if token in self.postings else []
+                scores: Dict[int, float] = {}
+                for term in terms:
+                    posting = self.postings[term]
+                    idf = math.log(1 + total / len(posting))
+                    if term != token:
+                        idf *= PREFIX_PENALTY
+                    for doc_id, weight in posting.items():
+                        score = weight * idf
+                        if score > scores.get(doc_id, 0.0):
+                            scores[doc_id] = score
+                if not scores:
+                    return []
+                per_token.append(scores)
+
+        # Intersect starting from the most selective term
+        per_token.sort(key=len)
+        smallest, rest = per_token[0], per_token[1:]
+        ranked = []
+        for doc_id, score in smallest.items():
+            for scores in rest:
+                other = scores.get(doc_id)
+                if other is None:
+                    break
+                score += other
+            else:
+                ranked.append((doc_id, score))
+
+        key = lambda hit: (hit[1], -hit[0])
+        if limit is not None and limit < len(ranked):
+            return heapq.nlargest(limit, ranked, key=key)
+        return sorted(ranked, key=key, reverse=True)
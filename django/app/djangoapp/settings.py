@@ -27,7 +27,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'djangoapp.accesslog.AccessLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'djangoapp.ratelimit.RateLimitMiddleware',
+    'djangoapp.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -118,12 +121,19 @@ SECURE_CONTENT_TYPE_NOSNIFF = True
 X_FRAME_OPTIONS = 'DENY'
 
 # Logging configuration
+# JSON lines written by a background thread; request threads only enqueue records
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'djangoapp.accesslog.JsonFormatter',
+        },
+    },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
+            '()': 'djangoapp.accesslog.access_log_handler',
+            'formatter': 'json',
         },
     },
     'loggers': {
@@ -131,5 +141,10 @@ LOGGING = {
             'handlers': ['console'],
             'level': 'INFO',
         },
+        'access': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
-} 
\ No newline at end of file
+}
@@ -10,6 +10,7 @@ urlpatterns = [
     
     # Health check
     path('health/', views.health_view, name='health'),
+    path('livez', views.livez_view, name='livez'),
     
     # User endpoints
     path('api/users/', views.users_list_view, name='users_list'),
@@ -19,6 +20,12 @@ urlpatterns = [
     # Product endpoints  
     path('api/products/', views.products_list_view, name='products_list'),
     
+    # Batch endpoint
+    path('api/batch/', views.batch_view, name='batch'),
+    
+    # Change feed (Server-Sent Events)
+    path('api/events/', views.events_view, name='events'),
+    
     # Stats endpoint
     path('api/stats/', views.stats_view, name='stats'),
 ] 
\ No newline at end of file
@@ -1,13 +1,19 @@
 """
 Django views for REST API endpoints
 """
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, QueryDict, StreamingHttpResponse
+from django.urls import Resolver404, resolve
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import json
-import psutil
-import platform
+import os
+import threading
 from datetime import datetime
+from .compression import cached_payload, payload_cache
+from .events import ChangeFeed
+from .projection import Schema, UnknownFieldError, parse_fields
+from .ratelimit import expensive
+from .search import SearchIndex
 
 # Sample data
 USERS = [
@@ -25,6 +31,117 @@ PRODUCTS = [
     {"id": 4, "name": "Web Development Course", "price": 79.99, "category": "Education", "in_stock": True}
 ]
 
+# Id indexes; detail and batch lookups go through these instead of scanning lists
+USERS_BY_ID = {}
+PRODUCTS_BY_ID = {}
+
+# Lower-cased role/category -> {id: record}, so filters never lower() per row
+USERS_BY_ROLE = {}
+PRODUCTS_BY_CATEGORY = {}
+
+# Full-text indexes for ``q=``; field weights favour names over descriptions
+USER_INDEX = SearchIndex({'name': 3, 'email': 1})
+PRODUCT_INDEX = SearchIndex({'name': 3, 'category': 2, 'description': 1})
+
+# Serializes id assignment and index updates across threads of a worker (gunicorn runs gthread)
+_write_lock = threading.Lock()
+
+def index_user(user):
+    """Add a user to every user index"""
+    USERS_BY_ID[user['id']] = user
+    USERS_BY_ROLE.setdefault(user['role'].lower(), {})[user['id']] = user
+    USER_INDEX.add(user['id'], user)
+
+def index_product(product):
+    """Add a product to every product index"""
+    PRODUCTS_BY_ID[product['id']] = product
+    PRODUCTS_BY_CATEGORY.setdefault(product['category'].lower(), {})[product['id']] = product
+    PRODUCT_INDEX.add(product['id'], product)
+
+def rebuild_indexes():
+    """Rebuild every in-memory index from USERS and PRODUCTS"""
+    USERS_BY_ID.clear()
+    USERS_BY_ROLE.clear()
+    USER_INDEX.clear()
+    for user in USERS:
+        index_user(user)
+    PRODUCTS_BY_ID.clear()
+    PRODUCTS_BY_CATEGORY.clear()
+    PRODUCT_INDEX.clear()
+    for product in PRODUCTS:
+        index_product(product)
+
+rebuild_indexes()
+
+# Projectable fields per collection
+USER_SCHEMA = Schema(['id', 'name', 'email', 'role'])
+PRODUCT_SCHEMA = Schema(['id', 'name', 'price', 'category', 'in_stock'])
+
+def projector_for(params, schema):
+    """Compile the ``fields=`` parameter into a projector for schema"""
+    return schema.projector(parse_fields(params.get('fields')))
+
+# Multi-id lookups (``ids=1,2,3``) and /api/batch/ are capped per call
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 100))
+
+class InvalidParameterError(ValueError):
+    """Raised for malformed query parameters; rendered as a 400 response"""
+
+def parse_ids(raw):
+    """Parse an ``ids=1,2,3`` parameter into a list of ints, or None when absent"""
+    if raw is None:
+        return None
+    try:
+        ids = [int(part) for part in raw.split(',') if part.strip()]
+    except ValueError:
+        raise InvalidParameterError("ids must be a comma-separated list of integers")
+    if len(ids) > MAX_BATCH_SIZE:
+        raise InvalidParameterError(f"At most {MAX_BATCH_SIZE} ids per request")
+    return ids
+
+def rank_by_search(search_index, by_id, query, candidates=None, limit=None):
+    """Records matching a ``q=`` query, best first, optionally restricted to candidates"""
+    hits = search_index.search(query, limit)
+    if candidates is not None:
+        allowed = {record['id'] for record in candidates}
+        hits = [hit for hit in hits if hit[0] in allowed]
+    return [by_id[doc_id] for doc_id, _ in hits]
+
+def filter_by_bucket(records, full, buckets, value):
+    """Apply a case-insensitive equality filter through a precomputed bucket index"""
+    bucket = buckets.get(value.lower(), {})
+    if records is full:
+        return list(bucket.values())
+    return [record for record in records if record['id'] in bucket]
+
+def select_by_ids(index, ids):
+    """Look up ids in an id index, preserving request order; returns (found, missing ids)"""
+    found, missing = [], []
+    for record_id in ids:
+        record = index.get(record_id)
+        if record is None:
+            missing.append(record_id)
+        else:
+            found.append(record)
+    return found, missing
+
+def bad_parameter_response(error):
+    """Response for unknown projection fields and malformed query parameters"""
+    return JsonResponse({
+        "success": False,
+        "message": str(error)
+    }, status=400)
+
+# Every write is published here as a delta for /api/events/ subscribers
+CHANGE_FEED = ChangeFeed()
+
+# Liveness payload is static, so it is encoded once per worker
+LIVEZ_BODY = json.dumps({"status": "alive", "service": "django-docker-app"}).encode()
+
+def livez_view(request):
+    """Liveness probe for container monitoring; never touches system stats"""
+    return HttpResponse(LIVEZ_BODY, content_type="application/json")
+
 def home_view(request):
     """Home endpoint with API information"""
     return JsonResponse({
@@ -34,9 +151,12 @@ def home_view(request):
         "framework": "Django 5.0",
         "endpoints": {
             "health": "/health/",
+            "livez": "/livez",
             "users": "/api/users/",
             "products": "/api/products/",
-            "stats": "/api/stats/"
+            "stats": "/api/stats/",
+            "batch": "/api/batch/",
+            "events": "/api/events/"
         },
         "timestamp": datetime.now().isoformat(),
         "documentation": "Visit the endpoints above to explore the API"
@@ -45,6 +165,10 @@ def home_view(request):
 def health_view(request):
     """Health check endpoint"""
     try:
+        # psutil and platform are only needed here, so keep them off the worker import path
+        import platform
+        import psutil
+
         # Basic health checks
         memory = psutil.virtual_memory()
         disk = psutil.disk_usage('/')
@@ -69,16 +193,29 @@ def health_view(request):
             "timestamp": datetime.now().isoformat()
         }, status=500)
 
-def users_list_view(request):
-    """Get all users with optional filtering"""
-    role = request.GET.get('role')
-    limit = request.GET.get('limit')
+def users_payload(params):
+    """Users matching search/role/ids filters"""
+    query = params.get('q')
+    role = params.get('role')
+    limit = params.get('limit')
+    ids = parse_ids(params.get('ids'))
+    project = projector_for(params, USER_SCHEMA)
     
     filtered_users = USERS
+    missing = None
+    
+    # Select by id
+    if ids is not None:
+        filtered_users, missing = select_by_ids(USERS_BY_ID, ids)
+    
+    # Full-text search, ranked
+    if query:
+        candidates = filtered_users if ids is not None else None
+        filtered_users = rank_by_search(USER_INDEX, USERS_BY_ID, query, candidates)
     
     # Filter by role
     if role:
-        filtered_users = [user for user in filtered_users if user['role'].lower() == role.lower()]
+        filtered_users = filter_by_bucket(filtered_users, USERS, USERS_BY_ROLE, role)
     
     # Apply limit
     if limit:
@@ -88,66 +225,203 @@ def users_list_view(request):
         except ValueError:
             pass
     
-    return JsonResponse({
+    payload = {
         "success": True,
         "count": len(filtered_users),
-        "data": filtered_users,
+        "data": [project(user) for user in filtered_users],
         "filters": {
+            "q": query,
             "role": role,
-            "limit": limit
+            "limit": limit,
+            "ids": ids
         }
-    })
+    }
+    if missing is not None:
+        payload["missing"] = missing
+    return payload, 200
 
-def user_detail_view(request, user_id):
-    """Get a specific user by ID"""
+def user_payload(params, user_id):
+    """Single user by ID"""
+    project = projector_for(params, USER_SCHEMA)
     try:
         user_id = int(user_id)
-        user = next((user for user in USERS if user['id'] == user_id), None)
-        
-        if user:
-            return JsonResponse({
-                "success": True,
-                "data": user
-            })
-        else:
-            return JsonResponse({
-                "success": False,
-                "message": "User not found"
-            }, status=404)
     except ValueError:
-        return JsonResponse({
+        return {
             "success": False,
             "message": "Invalid user ID"
-        }, status=400)
+        }, 400
+    
+    user = USERS_BY_ID.get(user_id)
+    if user:
+        return {
+            "success": True,
+            "data": project(user)
+        }, 200
+    return {
+        "success": False,
+        "message": "User not found"
+    }, 404
 
-def products_list_view(request):
-    """Get all products with optional filtering"""
-    category = request.GET.get('category')
-    in_stock_only = request.GET.get('in_stock') == 'true'
+def products_payload(params):
+    """Products matching search/category/stock/ids filters"""
+    query = params.get('q')
+    category = params.get('category')
+    in_stock_only = params.get('in_stock') == 'true'
+    ids = parse_ids(params.get('ids'))
+    project = projector_for(params, PRODUCT_SCHEMA)
     
     filtered_products = PRODUCTS
+    missing = None
+    
+    # Select by id
+    if ids is not None:
+        filtered_products, missing = select_by_ids(PRODUCTS_BY_ID, ids)
+    
+    # Full-text search, ranked
+    if query:
+        candidates = filtered_products if ids is not None else None
+        filtered_products = rank_by_search(PRODUCT_INDEX, PRODUCTS_BY_ID, query, candidates)
     
     # Filter by category
     if category:
-        filtered_products = [p for p in filtered_products if p['category'].lower() == category.lower()]
+        filtered_products = filter_by_bucket(filtered_products, PRODUCTS, PRODUCTS_BY_CATEGORY, category)
     
     # Filter by stock status
     if in_stock_only:
         filtered_products = [p for p in filtered_products if p['in_stock']]
     
-    return JsonResponse({
+    payload = {
         "success": True,
         "count": len(filtered_products),
-        "data": filtered_products,
+        "data": [project(p) for p in filtered_products],
         "filters": {
+            "q": query,
             "category": category,
-            "in_stock_only": in_stock_only
+            "in_stock_only": in_stock_only,
+            "ids": ids
         }
+    }
+    if missing is not None:
+        payload["missing"] = missing
+    return payload, 200
+
+@cached_payload
+def users_list_view(request):
+    """Get all users with optional filtering"""
+    try:
+        payload, status = users_payload(request.GET)
+    except (UnknownFieldError, InvalidParameterError) as e:
+        return bad_parameter_response(e)
+    return JsonResponse(payload, status=status)
+
+def user_detail_view(request, user_id):
+    """Get a specific user by ID"""
+    try:
+        payload, status = user_payload(request.GET, user_id)
+    except (UnknownFieldError, InvalidParameterError) as e:
+        return bad_parameter_response(e)
+    return JsonResponse(payload, status=status)
+
+@cached_payload
+def products_list_view(request):
+    """Get all products with optional filtering"""
+    try:
+        payload, status = products_payload(request.GET)
+    except (UnknownFieldError, InvalidParameterError) as e:
+        return bad_parameter_response(e)
+    return JsonResponse(payload, status=status)
+
+# Read endpoints (by URL name) that can run inside /api/batch/ without a WSGI round trip
+BATCH_HANDLERS = {
+    'users_list': users_payload,
+    'user_detail': user_payload,
+    'products_list': products_payload,
+}
+
+def run_subrequest(path):
+    """Resolve one batched GET path against the URLconf and build its payload"""
+    if not isinstance(path, str):
+        return {"path": path, "status": 400, "body": {"success": False, "message": "Invalid path"}}
+    
+    route, _, query = path.partition('?')
+    try:
+        match = resolve(route)
+    except Resolver404:
+        return {"path": path, "status": 404, "body": {"success": False, "message": "Endpoint not found"}}
+    
+    handler = BATCH_HANDLERS.get(match.url_name)
+    if handler is None:
+        return {"path": path, "status": 400, "body": {"success": False, "message": "Endpoint not supported in batch"}}
+    
+    try:
+        payload, status = handler(QueryDict(query), *match.args, **match.kwargs)
+    except (UnknownFieldError, InvalidParameterError) as e:
+        payload, status = {"success": False, "message": str(e)}, 400
+    return {"path": path, "status": status, "body": payload}
+
+@expensive
+@csrf_exempt
+@require_http_methods(["POST"])
+def batch_view(request):
+    """Run several read sub-requests in one call and return them in one response"""
+    try:
+        body = json.loads(request.body)
+    except json.JSONDecodeError:
+        body = None
+    subrequests = body.get('requests') if isinstance(body, dict) else None
+    
+    if not isinstance(subrequests, list) or not subrequests:
+        return JsonResponse({
+            "success": False,
+            "message": "Expected a non-empty 'requests' list"
+        }, status=400)
+    
+    if len(subrequests) > MAX_BATCH_SIZE:
+        return JsonResponse({
+            "success": False,
+            "message": f"At most {MAX_BATCH_SIZE} requests per batch"
+        }, status=400)
+    
+    responses = [
+        run_subrequest(sub.get('path') if isinstance(sub, dict) else sub)
+        for sub in subrequests
+    ]
+    
+    return JsonResponse({
+        "success": True,
+        "count": len(responses),
+        "responses": responses
     })
 
+def events_view(request):
+    """Stream data changes as Server-Sent Events, resuming after Last-Event-ID"""
+    last_event_id = request.headers.get('Last-Event-ID', request.GET.get('lastEventId'))
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return bad_parameter_response(InvalidParameterError("Last-Event-ID must be an integer"))
+    
+    subscription = CHANGE_FEED.subscribe(last_id)
+    if subscription is None:
+        response = JsonResponse({
+            "success": False,
+            "message": "Too many event streams, try again shortly"
+        }, status=503)
+        response['Retry-After'] = '5'
+        return response
+    
+    response = StreamingHttpResponse(subscription, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@expensive
 def stats_view(request):
     """Get application statistics"""
     try:
+        import platform
+        import psutil
+
         # System stats
         memory = psutil.virtual_memory()
         cpu_percent = psutil.cpu_percent(interval=1)
@@ -201,6 +475,11 @@ def create_user_view(request):
     """Create a new user (example POST endpoint)"""
     try:
         data = json.loads(request.body)
+        if not isinstance(data, dict):
+            return JsonResponse({
+                "success": False,
+                "message": "Invalid JSON data"
+            }, status=400)
         
         # Basic validation
         required_fields = ['name', 'email', 'role']
@@ -210,17 +489,28 @@ def create_user_view(request):
                     "success": False,
                     "message": f"Missing required field: {field}"
                 }, status=400)
+            # The role and search indexes need text
+            if not isinstance(data[field], str):
+                return JsonResponse({
+                    "success": False,
+                    "message": f"{field} must be a string"
+                }, status=400)
         
         # Create new user
-        new_id = max(user['id'] for user in USERS) + 1
-        new_user = {
-            "id": new_id,
-            "name": data['name'],
-            "email": data['email'],
-            "role": data['role']
-        }
-        
-        USERS.append(new_user)
+        with _write_lock:
+            new_id = max(USERS_BY_ID, default=0) + 1
+            new_user = {
+                "id": new_id,
+                "name": data['name'],
+                "email": data['email'],
+                "role": data['role']
+            }
+            
+            # Index first, so a failure leaves the user out of USERS as well
+            index_user(new_user)
+            USERS.append(new_user)
+        payload_cache.invalidate()
+        CHANGE_FEED.publish('user', 'created', new_user)
         
         return JsonResponse({
             "success": True,
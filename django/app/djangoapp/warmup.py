@@ -0,0 +1,36 @@
+"""
+Worker warm-up for Django Docker app
+"""
+from io import BytesIO
+
+# Cheap GET endpoints that exercise URL resolution, middleware and JSON encoding
+WARM_UP_PATHS = ['/livez', '/', '/api/users/', '/api/users/1/', '/api/products/']
+
+
+def _environ(path):
+    """Build a minimal WSGI environ for an internal GET request"""
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '8000',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': BytesIO(),
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+
+
+def warm_up(application):
+    """Pay first-request costs (URL resolver, middleware chain, JSON encoding) before serving traffic"""
+    for path in WARM_UP_PATHS:
+        response = application(_environ(path), lambda status, headers, exc_info=None: None)
+        for _ in response:
+            pass
+        if hasattr(response, 'close'):
+            response.close()
@@ -0,0 +1,14 @@
+"""
+Gunicorn configuration for Django Docker app
+"""
+import os
+
+# Threaded workers, so long-lived /api/events streams do not block other requests
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+
+def post_worker_init(worker):
+    """Warm up each worker after fork, once the app is loaded and before it accepts requests"""
+    from djangoapp.warmup import warm_up
+    warm_up(worker.wsgi)
@@ -0,0 +1,179 @@
+"""
+Time-bucketed order rollups for Flask application
+"""
+import bisect
+import math
+import threading
+from array import array
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# Bucket widths in seconds
+GRANULARITIES = {'hour': 3600, 'day': 86400}
+
+# Timestamps format_timestamp can represent
+MIN_TIMESTAMP = datetime.min.replace(tzinfo=timezone.utc).timestamp()
+MAX_TIMESTAMP = datetime.max.replace(microsecond=0, tzinfo=timezone.utc).timestamp()
+
+
+def parse_timestamp(value: str) -> float:
+    """Parse an ISO 8601 string or epoch seconds into epoch seconds; naive times are UTC
+
+    Raises ValueError for anything else, including nan/inf and times outside datetime's range.
+    """
+    try:
+        timestamp = float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        timestamp = parsed.timestamp()
+    if not (math.isfinite(timestamp) and MIN_TIMESTAMP <= timestamp <= MAX_TIMESTAMP):
+        raise ValueError(f"Timestamp out of range: {value}")
+    return timestamp
+
+
+def format_timestamp(timestamp: float) -> str:
+    """Epoch seconds as an ISO 8601 UTC string"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+# Bucket starts repeat across queries, so their ISO strings are cached
+_format_bucket = lru_cache(maxsize=65536)(format_timestamp)
+
+
+def _summary(revenue: float, count: int) -> Dict[str, Any]:
+    return {
+        "revenue": round(revenue, 2),
+        "count": count,
+        "averageOrderValue": round(revenue / count, 2) if count else 0
+    }
+
+
+class RevenueRollup:
+    """Revenue and order counts per time bucket and status, maintained incrementally on insert"""
+
+    def __init__(self, granularities: Optional[Dict[str, int]] = None):
+        self.granularities = dict(granularities or GRANULARITIES)
+        # granularity -> bucket start -> status -> [revenue, count]
+        self._buckets: Dict[str, Dict[int, Dict[str, List]]] = {name: {} for name in self.granularities}
+        # granularity -> sorted bucket starts, for range scans
+        self._starts: Dict[str, List[int]] = {name: [] for name in self.granularities}
+        # Sorted (timestamp, order id) index
+        self.timestamps: List[Tuple[float, int]] = []
+        self._lock = threading.Lock()
+
+    def add(self, order_id: int, timestamp: float, status: str, total: float) -> None:
+        """Fold one order into every granularity's bucket"""
+        with self._lock:
+            bisect.insort(self.timestamps, (timestamp, order_id))
+            for name, width in self.granularities.items():
+                start = int(timestamp // width * width)
+                buckets = self._buckets[name]
+                bucket = buckets.get(start)
+                if bucket is None:
+                    bucket = buckets[start] = {}
+                    bisect.insort(self._starts[name], start)
+                cell = bucket.get(status)
+                if cell is None:
+                    cell = bucket[status] = [0.0, 0]
+                cell[0] += total
+                cell[1] += 1
+
+    def clear(self) -> None:
+        """Drop every rollup"""
+        with self._lock:
+            for name in self.granularities:
+                self._buckets[name].clear()
+                self._starts[name].clear()
+            self.timestamps.clear()
+
+    def export(self) -> Dict[str, Sequence]:
+        """The rollups as flat columns: one row per bucket and status, plus the createdAt index"""
+        columns: Dict[str, Sequence] = {}
+        with self._lock:
+            columns["timestamps"] = array('d', (timestamp for timestamp, _ in self.timestamps))
+            columns["order_ids"] = array('q', (order_id for _, order_id in self.timestamps))
+            for name in self.granularities:
+                rows = [
+                    (start, status, cell)
+                    for start in self._starts[name]
+                    for status, cell in self._buckets[name][start].items()
+                ]
+                columns[f"{name}.starts"] = array('q', (row[0] for row in rows))
+                columns[f"{name}.statuses"] = [row[1] for row in rows]
+                columns[f"{name}.revenue"] = array('d', (row[2][0] for row in rows))
+                columns[f"{name}.counts"] = array('q', (row[2][1] for row in rows))
+        return columns
+
+    def load(self, columns: Mapping[str, Sequence]) -> None:
+        """Replace the rollups with columns produced by ``export``"""
+        buckets: Dict[str, Dict[int, Dict[str, List]]] = {name: {} for name in self.granularities}
+        for name in self.granularities:
+            rows = zip(columns[f"{name}.starts"], columns[f"{name}.statuses"],
+                       columns[f"{name}.revenue"], columns[f"{name}.counts"])
+            for start, status, revenue, count in rows:
+                buckets[name].setdefault(start, {})[status] = [revenue, count]
+        with self._lock:
+            self._buckets = buckets
+            self._starts = {name: sorted(buckets[name]) for name in self.granularities}
+            self.timestamps = list(zip(columns["timestamps"], columns["order_ids"]))
+
+    def order_ids_between(self, start: float, end: float) -> List[int]:
+        """Ids of orders created in [start, end), oldest first"""
+        with self._lock:
+            lo = bisect.bisect_left(self.timestamps, (start, float('-inf')))
+            hi = bisect.bisect_left(self.timestamps, (end, float('-inf')))
+            return [order_id for _, order_id in self.timestamps[lo:hi]]
+
+    def span(self) -> Optional[Tuple[float, float]]:
+        """(first, last) order timestamps, or None when empty"""
+        with self._lock:
+            if not self.timestamps:
+                return None
+            return self.timestamps[0][0], self.timestamps[-1][0]
+
+    def query(self, start: float, end: float, granularity: str) -> Dict[str, Any]:
+        """Buckets overlapping [start, end) with per-status and overall summaries
+
+        ``start`` is rounded down to its bucket boundary; only non-empty buckets are returned.
+        """
+        width = self.granularities[granularity]
+        start = start // width * width
+        with self._lock:
+            starts = self._starts[granularity]
+            lo = bisect.bisect_left(starts, start)
+            hi = bisect.bisect_left(starts, end)
+            buckets_by_start = self._buckets[granularity]
+            # Snapshot the cells so summaries can be built outside the lock
+            selected = [
+                (bucket_start, {status: tuple(cell) for status, cell in buckets_by_start[bucket_start].items()})
+                for bucket_start in starts[lo:hi]
+            ]
+
+        totals: Dict[str, List] = {}
+        buckets = []
+        for bucket_start, bucket in selected:
+            revenue = sum(cell[0] for cell in bucket.values())
+            count = sum(cell[1] for cell in bucket.values())
+            for status, (status_revenue, status_count) in bucket.items():
+                total = totals.setdefault(status, [0.0, 0])
+                total[0] += status_revenue
+                total[1] += status_count
+            buckets.append({
+                "start": _format_bucket(bucket_start),
+                **_summary(revenue, count),
+                "byStatus": {status: _summary(*cell) for status, cell in sorted(bucket.items())}
+            })
+
+        return {
+            "granularity": granularity,
+            "from": format_timestamp(start),
+            "to": format_timestamp(end),
+            "buckets": buckets,
+            "totals": {
+                **_summary(sum(t[0] for t in totals.values()), sum(t[1] for t in totals.values())),
+                "byStatus": {status: _summary(*cell) for status, cell in sorted(totals.items())}
+            }
+        }
@@ -1,8 +1,24 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
-from datetime import datetime
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl
+import gc
+import json
 import os
-import psutil
+import threading
+import time
+from accesslog import ACCESS_LOG_ENABLED, ACCESS_LOG_SAMPLE_RATE, access_logger, log_reason
+from analytics import GRANULARITIES, RevenueRollup, format_timestamp, parse_timestamp
+from events import ChangeFeed
+from ratelimit import (RATE_LIMIT_ENABLED, RATE_LIMIT_EXPENSIVE_COST, RATE_LIMIT_TRUST_PROXY,
+                       LoadShedder, create_limiter)
+from compression import COMPRESSIBLE_TYPES, EncodedPayload, PayloadCache, negotiate
+from projection import Schema, UnknownFieldError, parse_fields
+from reports import REPORTS, ReportBusyError, ReportError, ReportManager
+from search import SearchIndex
+from snapshot import SNAPSHOT_DIR, SNAPSHOT_ENABLED, Snapshot, SnapshotError, SnapshotWriter, source_key
 
 app = Flask(__name__)
 CORS(app)
@@ -23,16 +39,402 @@ products = [
 ]
 
 orders = [
-    {"id": 1, "userId": 1, "productId": 1, "quantity": 1, "total": 999.99, "status": "completed"},
-    {"id": 2, "userId": 2, "productId": 2, "quantity": 2, "total": 39.98, "status": "pending"},
-    {"id": 3, "userId": 1, "productId": 4, "quantity": 1, "total": 699.99, "status": "completed"}
+    {"id": 1, "userId": 1, "productId": 1, "quantity": 1, "total": 999.99, "status": "completed", "createdAt": "2024-06-01T09:15:00Z"},
+    {"id": 2, "userId": 2, "productId": 2, "quantity": 2, "total": 39.98, "status": "pending", "createdAt": "2024-06-01T14:40:00Z"},
+    {"id": 3, "userId": 1, "productId": 4, "quantity": 1, "total": 699.99, "status": "completed", "createdAt": "2024-06-02T11:05:00Z"}
 ]
 
+ORDER_STATUSES = ('pending', 'processing', 'shipped', 'completed', 'cancelled')
+
+# Id indexes; detail, batch and enrichment lookups go through these instead of scanning lists
+users_by_id = {}
+products_by_id = {}
+orders_by_id = {}
+
+# Products keyed by lower-cased category (each bucket maps id -> product), so filters never lower() per row
+products_by_category = {}
+
+# Revenue rollups per hour/day bucket and status, plus a sorted createdAt index
+revenue_rollup = RevenueRollup()
+
+# Full-text indexes for ``q=``; field weights favour names over descriptions
+user_index = SearchIndex({'name': 3, 'email': 1})
+product_index = SearchIndex({'name': 3, 'category': 2, 'description': 1})
+
+# Serializes id assignment and index updates across threads of a worker
+_write_lock = threading.Lock()
+
+# Id the next recorded order gets; kept in step by index_order so inserts never scan orders_by_id
+next_order_id = 1
+
+def index_user(user):
+    """Add or refresh a user in every user index"""
+    users_by_id[user['id']] = user
+    user_index.add(user['id'], user)
+
+def index_product(product):
+    """Add or refresh a product in every product index"""
+    previous = products_by_id.get(product['id'])
+    if previous is not None:
+        products_by_category.get(previous['category'].lower(), {}).pop(product['id'], None)
+    products_by_id[product['id']] = product
+    products_by_category.setdefault(product['category'].lower(), {})[product['id']] = product
+    product_index.add(product['id'], product)
+
+def index_order(order):
+    """Add an order to the id index and the revenue rollups"""
+    global next_order_id
+    orders_by_id[order['id']] = order
+    next_order_id = max(next_order_id, order['id'] + 1)
+    revenue_rollup.add(order['id'], parse_timestamp(order['createdAt']), order['status'], order['total'])
+
+def rebuild_indexes():
+    """Rebuild every in-memory index from the module-level lists"""
+    global next_order_id
+    users_by_id.clear()
+    user_index.clear()
+    for user in users:
+        index_user(user)
+    products_by_id.clear()
+    products_by_category.clear()
+    product_index.clear()
+    for product in products:
+        index_product(product)
+    orders_by_id.clear()
+    next_order_id = 1
+    revenue_rollup.clear()
+    for order in orders:
+        index_order(order)
+
+# Snapshot of the lists and their search/rollup indexes, reloaded instead of rebuilt on restart
+SNAPSHOT_PATH = os.path.join(SNAPSHOT_DIR, 'dataset.snapshot')
+# A snapshot taken from a different build of the dataset, or of the modules that lay out its
+# search index and rollups, is ignored
+SNAPSHOT_SOURCES = [__file__] + [os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+                                 for name in ('search.py', 'analytics.py')]
+SNAPSHOT_KEY = os.environ.get('SNAPSHOT_KEY') or source_key(*SNAPSHOT_SOURCES)
+
+def save_snapshot(path=SNAPSHOT_PATH):
+    """Write users/products/orders and their indexes to path atomically"""
+    writer = SnapshotWriter()
+    with _write_lock:
+        writer.add_table('users', users)
+        writer.add_table('products', products)
+        writer.add_table('orders', orders)
+        writer.add_group('user_index', user_index.export())
+        writer.add_group('product_index', product_index.export())
+        writer.add_group('revenue', revenue_rollup.export())
+    writer.write(path, SNAPSHOT_KEY)
+
+def restore_snapshot(path=SNAPSHOT_PATH):
+    """Load the dataset and its indexes from a snapshot; False when there is none"""
+    snapshot = Snapshot.open(path, SNAPSHOT_KEY)
+    if snapshot is None:
+        return False
+    # Millions of new dicts would otherwise trigger repeated cyclic GC passes over them
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        # Decode everything before touching live state, so a bad file leaves it intact
+        with snapshot:
+            restored_users = snapshot.table('users')
+            restored_products = snapshot.table('products')
+            restored_orders = snapshot.table('orders')
+            user_columns = snapshot.group('user_index')
+            product_columns = snapshot.group('product_index')
+            revenue_columns = snapshot.group('revenue')
+        apply_snapshot(restored_users, restored_products, restored_orders,
+                       user_columns, product_columns, revenue_columns)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return True
+
+def apply_snapshot(restored_users, restored_products, restored_orders,
+                   user_columns, product_columns, revenue_columns):
+    """Swap decoded snapshot data into the live lists and indexes"""
+    global next_order_id
+    with _write_lock:
+        users[:] = restored_users
+        products[:] = restored_products
+        orders[:] = restored_orders
+        users_by_id.clear()
+        users_by_id.update((user['id'], user) for user in users)
+        user_index.load(user_columns)
+        products_by_id.clear()
+        products_by_id.update((product['id'], product) for product in products)
+        products_by_category.clear()
+        for product in products:
+            products_by_category.setdefault(product['category'].lower(), {})[product['id']] = product
+        product_index.load(product_columns)
+        orders_by_id.clear()
+        orders_by_id.update((order['id'], order) for order in orders)
+        next_order_id = max(orders_by_id, default=0) + 1
+        revenue_rollup.load(revenue_columns)
+
+def load_dataset():
+    """Restore the dataset from its snapshot, or index it from scratch and write one"""
+    if SNAPSHOT_ENABLED:
+        try:
+            if restore_snapshot():
+                return
+        except (SnapshotError, KeyError, ValueError, TypeError, OSError) as error:
+            app.logger.warning("Ignoring snapshot %s: %s", SNAPSHOT_PATH, error)
+    rebuild_indexes()
+    if SNAPSHOT_ENABLED:
+        try:
+            save_snapshot()
+        except OSError as error:
+            app.logger.warning("Could not write snapshot %s: %s", SNAPSHOT_PATH, error)
+
+load_dataset()
+
+# Projectable fields per collection; nested records are only looked up when requested
+USER_SCHEMA = Schema(['id', 'name', 'email', 'role'])
+PRODUCT_SCHEMA = Schema(['id', 'name', 'price', 'category', 'inStock'])
+ORDER_SCHEMA = Schema(
+    ['id', 'userId', 'productId', 'quantity', 'total', 'status', 'createdAt'],
+    nested={
+        'user': (lambda o: users_by_id.get(o['userId']), USER_SCHEMA),
+        'product': (lambda o: products_by_id.get(o['productId']), PRODUCT_SCHEMA),
+    }
+)
+
+# Change-feed deltas carry the record's own fields, without nested user/product
+ORDER_DELTA = ORDER_SCHEMA.projector(ORDER_SCHEMA.fields)
+
+def projector_for(schema, args):
+    """Compile the ``fields=`` parameter into a projector for schema"""
+    return schema.projector(parse_fields(args.get('fields')))
+
+# Multi-id lookups (``ids=1,2,3``) and /api/batch are capped per call
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 100))
+
+class InvalidParameterError(ValueError):
+    """Raised for malformed query parameters; rendered as a 400 response"""
+
+def parse_ids(raw):
+    """Parse an ``ids=1,2,3`` parameter into a list of ints, or None when absent"""
+    if raw is None:
+        return None
+    try:
+        ids = [int(part) for part in raw.split(',') if part.strip()]
+    except ValueError:
+        raise InvalidParameterError("ids must be a comma-separated list of integers")
+    if len(ids) > MAX_BATCH_SIZE:
+        raise InvalidParameterError(f"At most {MAX_BATCH_SIZE} ids per request")
+    return ids
+
+def rank_by_search(search_index, by_id, query, candidates=None, limit=None):
+    """Records matching a ``q=`` query, best first, optionally restricted to candidates"""
+    hits = search_index.search(query, limit)
+    if candidates is not None:
+        allowed = {record['id'] for record in candidates}
+        hits = [hit for hit in hits if hit[0] in allowed]
+    return [by_id[doc_id] for doc_id, _ in hits]
+
+def parse_time_range(args, default_start, default_end):
+    """Parse ``from``/``to`` (ISO 8601 or epoch seconds) into an epoch [start, end) range
+
+    A missing bound defaults to ``default_start``/``default_end``, moved up to the given other
+    bound if need be, so ``from`` alone past the default end is an empty range rather than an error.
+    """
+    try:
+        start = parse_timestamp(args['from']) if 'from' in args else None
+        end = parse_timestamp(args['to']) if 'to' in args else None
+    except ValueError:
+        raise InvalidParameterError("from/to must be ISO 8601 timestamps or epoch seconds")
+    if start is None:
+        start = default_start if end is None else min(default_start, end)
+    if end is None:
+        end = max(default_end, start)
+    if end < start:
+        raise InvalidParameterError("to must not be earlier than from")
+    return start, end
+
+def select_by_ids(index, ids):
+    """Look up ids in an id index, preserving request order; returns (found, missing ids)"""
+    found, missing = [], []
+    for record_id in ids:
+        record = index.get(record_id)
+        if record is None:
+            missing.append(record_id)
+        else:
+            found.append(record)
+    return found, missing
+
+# Payloads that never change are encoded once per worker instead of once per request
+_static_bodies = {}
+
+def static_json(name, payload):
+    """Return a JSON response for a static payload, encoding it only once"""
+    body = _static_bodies.get(name)
+    if body is None:
+        body = _static_bodies[name] = app.json.response(payload).get_data()
+    return app.response_class(body, mimetype=app.json.mimetype)
+
+# Access logging; registered before every other hook so its timer starts first and its
+# after_request runs last, seeing the final (compressed) response
+access_log = access_logger()
+
+@app.before_request
+def start_access_timer():
+    g.access_start = time.perf_counter()
+
+@app.after_request
+def log_access(response):
+    """Queue a JSON access record for errors, slow requests and a sample of the rest"""
+    if not ACCESS_LOG_ENABLED:
+        return response
+    duration_ms = (time.perf_counter() - g.get('access_start', time.perf_counter())) * 1000
+    reason = log_reason(response.status_code, duration_ms)
+    if reason is None:
+        return response
+    access_log.info('access', extra={'access': {
+        "method": request.method,
+        "route": request.url_rule.rule if request.url_rule else None,
+        "path": request.path,
+        "status": response.status_code,
+        "durationMs": round(duration_ms, 3),
+        "size": response.content_length,
+        "cache": g.get('cache_status'),
+        "client": request.remote_addr,
+        "reason": reason,
+        "sampleRate": ACCESS_LOG_SAMPLE_RATE if reason == 'sampled' else 1
+    }})
+    return response
+
+# Per client/route token buckets and in-flight tracking; probes are never limited
+rate_limiter = create_limiter()
+load_shedder = LoadShedder()
+RATE_LIMIT_EXEMPT = {'livez'}
+
+def expensive(view):
+    """Mark a view that costs more rate-limit tokens and is shed first under load"""
+    view.expensive = True
+    return view
+
+def client_id():
+    """Address the rate limiter keys on"""
+    if RATE_LIMIT_TRUST_PROXY and 'X-Forwarded-For' in request.headers:
+        return request.headers['X-Forwarded-For'].split(',')[0].strip()
+    return request.remote_addr or 'unknown'
+
+def charge_rate_limit(cost):
+    """Take cost tokens from the client's bucket for this route; a 429 response when over budget"""
+    wait = rate_limiter.acquire(f"{client_id()}|{request.endpoint}", cost)
+    if not wait:
+        return None
+    response = jsonify({
+        "success": False,
+        "message": "Too many requests"
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, int(wait + 0.999)))
+    return response
+
+@app.before_request
+def limit_request_rate():
+    """Reject clients over their per-route budget before any other work is done"""
+    if request.endpoint in RATE_LIMIT_EXEMPT:
+        return None
+    load_shedder.enter()
+    g.load_tracked = True
+    if not RATE_LIMIT_ENABLED:
+        return None
+    # Expensive views pay the rest of their cost in charge_expensive_request, after cache hits are served
+    return charge_rate_limit(1)
+
+@app.teardown_request
+def release_load_slot(error=None):
+    """Balance the in-flight count taken in limit_request_rate"""
+    if g.pop('load_tracked', False):
+        load_shedder.leave()
+
+# Serialized list responses and their compressed variants, keyed by full request path
+payload_cache = PayloadCache(max_entries=int(os.environ.get('PAYLOAD_CACHE_SIZE', 256)))
+
+def cached(view):
+    """Mark a GET view whose JSON response may be served from the payload cache"""
+    view.cache_payload = True
+    return view
+
+@app.before_request
+def serve_cached_payload():
+    """Short-circuit cacheable GETs whose serialized payload is already cached"""
+    view = app.view_functions.get(request.endpoint)
+    if request.method != 'GET' or not getattr(view, 'cache_payload', False):
+        return None
+    g.cache_generation = payload_cache.generation
+    entry = payload_cache.get(request.full_path)
+    if entry is None:
+        g.cache_status = 'miss'
+        return None
+    g.cache_status = 'hit'
+    g.payload = entry
+    return app.response_class(entry.body, mimetype=app.json.mimetype)
+
+@app.before_request
+def charge_expensive_request():
+    """Charge the expensive surcharge only to requests that will actually run an expensive view"""
+    view = app.view_functions.get(request.endpoint)
+    if not RATE_LIMIT_ENABLED or not getattr(view, 'expensive', False) or RATE_LIMIT_EXPENSIVE_COST <= 1:
+        return None
+    return charge_rate_limit(RATE_LIMIT_EXPENSIVE_COST - 1)
+
+@app.before_request
+def shed_expensive_load():
+    """Refuse expensive handlers fast when the worker is saturated; cache hits never get here"""
+    view = app.view_functions.get(request.endpoint)
+    if not getattr(view, 'expensive', False):
+        return None
+    if not load_shedder.should_shed(request.headers.get('X-Request-Start')):
+        return None
+    response = jsonify({
+        "success": False,
+        "message": "Server busy, try again shortly"
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Cache fresh payloads and apply the negotiated Content-Encoding"""
+    if (response.direct_passthrough or response.is_streamed
+            or response.mimetype not in COMPRESSIBLE_TYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    entry = g.get('payload')
+    if entry is None:
+        entry = EncodedPayload(response.get_data())
+        if g.get('cache_status') == 'miss' and response.status_code == 200:
+            payload_cache.put(request.full_path, entry, g.cache_generation)
+
+    body, encoding = entry.encode(negotiate(request.headers.get('Accept-Encoding', '')))
+    response.vary.add('Accept-Encoding')
+    if encoding is not None:
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+# Liveness probe
+LIVEZ = {"status": "alive", "service": "flask-docker-app"}
+
+@app.route('/livez', methods=['GET'])
+def livez():
+    """Liveness probe for container monitoring; never touches system stats"""
+    return static_json('livez', LIVEZ)
+
 # Health check endpoint
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint for container monitoring"""
     try:
+        # psutil is only needed here, so keep it off the import path of every worker
+        import psutil
+
         memory_info = psutil.virtual_memory()
         return jsonify({
             "status": "healthy",
@@ -62,6 +464,7 @@ def root():
         "description": "A production-ready Flask API running in Docker",
         "endpoints": {
             "health": "/health",
+            "livez": "/livez",
             "users": "/api/users",
             "products": "/api/products",
             "orders": "/api/orders",
@@ -71,114 +474,207 @@ def root():
     })
 
 # API Documentation
+API_DOCS = {
+    "title": "Flask Docker App API",
+    "version": "1.0.0",
+    "description": "A sample Flask API with user, product, and order management",
+    "endpoints": [
+        {
+            "path": "/",
+            "method": "GET",
+            "description": "Root endpoint with app information"
+        },
+        {
+            "path": "/health",
+            "method": "GET",
+            "description": "Health check endpoint"
+        },
+        {
+            "path": "/livez",
+            "method": "GET",
+            "description": "Liveness probe"
+        },
+        {
+            "path": "/api/users",
+            "method": "GET",
+            "description": "Get all users",
+            "query_params": ["q", "role", "ids", "limit", "fields"]
+        },
+        {
+            "path": "/api/users/<int:user_id>",
+            "method": "GET",
+            "description": "Get user by ID",
+            "query_params": ["fields"]
+        },
+        {
+            "path": "/api/products",
+            "method": "GET",
+            "description": "Get all products",
+            "query_params": ["q", "category", "inStock", "ids", "limit", "fields"]
+        },
+        {
+            "path": "/api/products/<int:product_id>",
+            "method": "GET",
+            "description": "Get product by ID",
+            "query_params": ["fields"]
+        },
+        {
+            "path": "/api/orders",
+            "method": "GET",
+            "description": "Get all orders",
+            "query_params": ["userId", "status", "ids", "from", "to", "limit", "fields"]
+        },
+        {
+            "path": "/api/orders",
+            "method": "POST",
+            "description": "Create an order",
+            "body": {"userId": 1, "productId": 1, "quantity": 1}
+        },
+        {
+            "path": "/api/orders/<int:order_id>",
+            "method": "GET",
+            "description": "Get order by ID",
+            "query_params": ["fields"]
+        },
+        {
+            "path": "/api/events",
+            "method": "GET",
+            "description": "Server-Sent Events stream of data changes; resumes from Last-Event-ID"
+        },
+        {
+            "path": "/api/batch",
+            "method": "POST",
+            "description": "Run several GET sub-requests in one call",
+            "body": {"requests": [{"path": "/api/products/1"}]}
+        },
+        {
+            "path": "/api/stats",
+            "method": "GET",
+            "description": "Get application statistics"
+        },
+        {
+            "path": "/api/stats/revenue",
+            "method": "GET",
+            "description": "Revenue per hour/day bucket and status from precomputed rollups",
+            "query_params": ["from", "to", "granularity"]
+        },
+        {
+            "path": "/api/reports",
+            "method": "POST",
+            "description": "Start a background report (stats, orders.csv); returns a job to poll",
+            "body": {"type": "orders.csv", "params": {"status": "completed"}}
+        },
+        {
+            "path": "/api/reports/<id>",
+            "method": "GET, DELETE",
+            "description": "Report job status (with the result once done), or cancel it"
+        },
+        {
+            "path": "/api/reports/<id>/result",
+            "method": "GET",
+            "description": "Download a finished report"
+        }
+    ]
+}
+
 @app.route('/api/docs', methods=['GET'])
 def api_docs():
     """API documentation endpoint"""
-    return jsonify({
-        "title": "Flask Docker App API",
-        "version": "1.0.0",
-        "description": "A sample Flask API with user, product, and order management",
-        "endpoints": [
-            {
-                "path": "/",
-                "method": "GET",
-                "description": "Root endpoint with app information"
-            },
-            {
-                "path": "/health",
-                "method": "GET",
-                "description": "Health check endpoint"
-            },
-            {
-                "path": "/api/users",
-                "method": "GET",
-                "description": "Get all users",
-                "query_params": ["role", "limit"]
-            },
-            {
-                "path": "/api/users/<int:user_id>",
-                "method": "GET",
-                "description": "Get user by ID"
-            },
-            {
-                "path": "/api/products",
-                "method": "GET",
-                "description": "Get all products",
-                "query_params": ["category", "inStock", "limit"]
-            },
-            {
-                "path": "/api/products/<int:product_id>",
-                "method": "GET",
-                "description": "Get product by ID"
-            },
-            {
-                "path": "/api/orders",
-                "method": "GET",
-                "description": "Get all orders",
-                "query_params": ["userId", "status", "limit"]
-            },
-            {
-                "path": "/api/orders/<int:order_id>",
-                "method": "GET",
-                "description": "Get order by ID"
-            },
-            {
-                "path": "/api/stats",
-                "method": "GET",
-                "description": "Get application statistics"
-            }
-        ]
-    })
+    return static_json('api_docs', API_DOCS)
 
 # Users API
-@app.route('/api/users', methods=['GET'])
-def get_users():
-    """Get all users with optional filtering"""
-    role = request.args.get('role')
-    limit = request.args.get('limit', type=int)
+def users_payload(args):
+    """Users matching search/role/ids filters"""
+    query = args.get('q')
+    role = args.get('role')
+    limit = args.get('limit', type=int)
+    ids = parse_ids(args.get('ids'))
+    project = projector_for(USER_SCHEMA, args)
     
     filtered_users = users
+    missing = None
+    
+    if ids is not None:
+        filtered_users, missing = select_by_ids(users_by_id, ids)
+    
+    if query:
+        candidates = filtered_users if ids is not None else None
+        # Only let the index truncate when no later filter can drop results
+        search_limit = limit if limit and limit > 0 and candidates is None and not role else None
+        filtered_users = rank_by_search(user_index, users_by_id, query, candidates, search_limit)
     
     if role:
-        filtered_users = [user for user in users if user['role'] == role]
+        filtered_users = [user for user in filtered_users if user['role'] == role]
     
     if limit:
         filtered_users = filtered_users[:limit]
     
-    return jsonify({
+    payload = {
         "success": True,
         "count": len(filtered_users),
-        "data": filtered_users
-    })
+        "data": [project(user) for user in filtered_users]
+    }
+    if missing is not None:
+        payload["missing"] = missing
+    return payload, 200
 
-@app.route('/api/users/<int:user_id>', methods=['GET'])
-def get_user(user_id):
-    """Get user by ID"""
-    user = next((user for user in users if user['id'] == user_id), None)
+def user_payload(args, user_id):
+    """Single user by ID"""
+    project = projector_for(USER_SCHEMA, args)
+    user = users_by_id.get(user_id)
     
     if not user:
-        return jsonify({
+        return {
             "success": False,
             "message": "User not found"
-        }), 404
+        }, 404
     
-    return jsonify({
+    return {
         "success": True,
-        "data": user
-    })
+        "data": project(user)
+    }, 200
+
+@app.route('/api/users', methods=['GET'])
+@cached
+def get_users():
+    """Get all users with optional filtering"""
+    payload, status = users_payload(request.args)
+    return jsonify(payload), status
+
+@app.route('/api/users/<int:user_id>', methods=['GET'])
+def get_user(user_id):
+    """Get user by ID"""
+    payload, status = user_payload(request.args, user_id)
+    return jsonify(payload), status
 
 # Products API
-@app.route('/api/products', methods=['GET'])
-def get_products():
-    """Get all products with optional filtering"""
-    category = request.args.get('category')
-    in_stock = request.args.get('inStock')
-    limit = request.args.get('limit', type=int)
+def products_payload(args):
+    """Products matching search/category/stock/ids filters"""
+    query = args.get('q')
+    category = args.get('category')
+    in_stock = args.get('inStock')
+    limit = args.get('limit', type=int)
+    ids = parse_ids(args.get('ids'))
+    project = projector_for(PRODUCT_SCHEMA, args)
     
     filtered_products = products
+    missing = None
+    
+    if ids is not None:
+        filtered_products, missing = select_by_ids(products_by_id, ids)
+    
+    if query:
+        candidates = filtered_products if ids is not None else None
+        # Only let the index truncate when no later filter can drop results
+        search_limit = limit if limit and limit > 0 and candidates is None and not category and in_stock is None else None
+        filtered_products = rank_by_search(product_index, products_by_id, query, candidates, search_limit)
     
     if category:
-        filtered_products = [p for p in filtered_products if p['category'].lower() == category.lower()]
+        in_category = products_by_category.get(category.lower(), {})
+        if filtered_products is products:
+            filtered_products = list(in_category.values())
+        else:
+            filtered_products = [p for p in filtered_products if p['id'] in in_category]
     
     if in_stock is not None:
         in_stock_bool = in_stock.lower() == 'true'
@@ -187,37 +683,68 @@ def get_products():
     if limit:
         filtered_products = filtered_products[:limit]
     
-    return jsonify({
+    payload = {
         "success": True,
         "count": len(filtered_products),
-        "data": filtered_products
-    })
+        "data": [project(p) for p in filtered_products]
+    }
+    if missing is not None:
+        payload["missing"] = missing
+    return payload, 200
 
-@app.route('/api/products/<int:product_id>', methods=['GET'])
-def get_product(product_id):
-    """Get product by ID"""
-    product = next((p for p in products if p['id'] == product_id), None)
+def product_payload(args, product_id):
+    """Single product by ID"""
+    project = projector_for(PRODUCT_SCHEMA, args)
+    product = products_by_id.get(product_id)
     
     if not product:
-        return jsonify({
+        return {
             "success": False,
             "message": "Product not found"
-        }), 404
+        }, 404
     
-    return jsonify({
+    return {
         "success": True,
-        "data": product
-    })
+        "data": project(product)
+    }, 200
+
+@app.route('/api/products', methods=['GET'])
+@cached
+def get_products():
+    """Get all products with optional filtering"""
+    payload, status = products_payload(request.args)
+    return jsonify(payload), status
+
+@app.route('/api/products/<int:product_id>', methods=['GET'])
+def get_product(product_id):
+    """Get product by ID"""
+    payload, status = product_payload(request.args, product_id)
+    return jsonify(payload), status
 
 # Orders API
-@app.route('/api/orders', methods=['GET'])
-def get_orders():
-    """Get all orders with optional filtering"""
-    user_id = request.args.get('userId', type=int)
-    status = request.args.get('status')
-    limit = request.args.get('limit', type=int)
+def orders_payload(args):
+    """Orders matching userId/status/ids/time filters, enriched with requested user/product fields"""
+    user_id = args.get('userId', type=int)
+    status = args.get('status')
+    limit = args.get('limit', type=int)
+    ids = parse_ids(args.get('ids'))
+    project = projector_for(ORDER_SCHEMA, args)
     
     filtered_orders = orders
+    missing = None
+    
+    if ids is not None:
+        filtered_orders, missing = select_by_ids(orders_by_id, ids)
+    
+    if 'from' in args or 'to' in args:
+        # Range scan over the sorted createdAt index
+        start, end = parse_time_range(args, float('-inf'), float('inf'))
+        in_range = revenue_rollup.order_ids_between(start, end)
+        if ids is None:
+            filtered_orders = [orders_by_id[order_id] for order_id in in_range]
+        else:
+            in_range = set(in_range)
+            filtered_orders = [o for o in filtered_orders if o['id'] in in_range]
     
     if user_id:
         filtered_orders = [o for o in filtered_orders if o['userId'] == user_id]
@@ -228,53 +755,209 @@ def get_orders():
     if limit:
         filtered_orders = filtered_orders[:limit]
     
-    # Add user and product information to orders
-    enriched_orders = []
-    for order in filtered_orders:
-        user = next((u for u in users if u['id'] == order['userId']), None)
-        product = next((p for p in products if p['id'] == order['productId']), None)
-        
-        enriched_order = {
-            **order,
-            "user": user,
-            "product": product
-        }
-        enriched_orders.append(enriched_order)
+    # User and product information is only looked up for requested fields
+    enriched_orders = [project(order) for order in filtered_orders]
     
-    return jsonify({
+    payload = {
         "success": True,
         "count": len(enriched_orders),
         "data": enriched_orders
-    })
+    }
+    if missing is not None:
+        payload["missing"] = missing
+    return payload, 200
+
+def order_payload(args, order_id):
+    """Single order by ID"""
+    project = projector_for(ORDER_SCHEMA, args)
+    order = orders_by_id.get(order_id)
+    
+    if not order:
+        return {
+            "success": False,
+            "message": "Order not found"
+        }, 404
+    
+    return {
+        "success": True,
+        "data": project(order)
+    }, 200
+
+@app.route('/api/orders', methods=['GET'])
+@cached
+@expensive
+def get_orders():
+    """Get all orders with optional filtering"""
+    payload, status = orders_payload(request.args)
+    return jsonify(payload), status
 
 @app.route('/api/orders/<int:order_id>', methods=['GET'])
 def get_order(order_id):
     """Get order by ID"""
-    order = next((o for o in orders if o['id'] == order_id), None)
+    payload, status = order_payload(request.args, order_id)
+    return jsonify(payload), status
+
+# Every write is published here as a delta for /api/events subscribers
+change_feed = ChangeFeed()
+
+def record_order(order):
+    """Append a new order and fold it into every index and rollup"""
+    with _write_lock:
+        order['id'] = next_order_id
+        orders.append(order)
+        index_order(order)
+    payload_cache.invalidate()
+    change_feed.publish('order', 'created', ORDER_DELTA(order))
+    return order
+
+@app.route('/api/orders', methods=['POST'])
+def create_order():
+    """Create a new order"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({
+            "success": False,
+            "message": "Invalid JSON data"
+        }), 400
     
-    if not order:
+    for field in ('userId', 'productId'):
+        if field not in data:
+            return jsonify({
+                "success": False,
+                "message": f"Missing required field: {field}"
+            }), 400
+    
+    user = users_by_id.get(data['userId'])
+    product = products_by_id.get(data['productId'])
+    quantity = data.get('quantity', 1)
+    status = data.get('status', 'pending')
+    
+    if user is None or product is None:
         return jsonify({
             "success": False,
-            "message": "Order not found"
-        }), 404
+            "message": "Unknown user or product"
+        }), 400
     
-    # Add user and product information
-    user = next((u for u in users if u['id'] == order['userId']), None)
-    product = next((p for p in products if p['id'] == order['productId']), None)
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+        return jsonify({
+            "success": False,
+            "message": "quantity must be a positive integer"
+        }), 400
     
-    enriched_order = {
-        **order,
-        "user": user,
-        "product": product
-    }
+    if status not in ORDER_STATUSES:
+        return jsonify({
+            "success": False,
+            "message": f"status must be one of: {', '.join(ORDER_STATUSES)}"
+        }), 400
+    
+    order = record_order({
+        "id": None,
+        "userId": user['id'],
+        "productId": product['id'],
+        "quantity": quantity,
+        "total": round(product['price'] * quantity, 2),
+        "status": status,
+        "createdAt": format_timestamp(datetime.now(timezone.utc).timestamp())
+    })
     
     return jsonify({
         "success": True,
-        "data": enriched_order
+        "message": "Order created successfully",
+        "data": ORDER_SCHEMA.projector(None)(order)
+    }), 201
+
+# Change feed (Server-Sent Events)
+@app.route('/api/events', methods=['GET'])
+def events():
+    """Stream data changes as Server-Sent Events, resuming after Last-Event-ID"""
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('lastEventId'))
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        raise InvalidParameterError("Last-Event-ID must be an integer")
+    
+    subscription = change_feed.subscribe(last_id)
+    if subscription is None:
+        response = jsonify({
+            "success": False,
+            "message": "Too many event streams, try again shortly"
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+    
+    return Response(subscription, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+# Batch API
+# Read endpoints that can run inside /api/batch without a WSGI round trip
+BATCH_HANDLERS = {
+    'get_users': users_payload,
+    'get_user': user_payload,
+    'get_products': products_payload,
+    'get_product': product_payload,
+    'get_orders': orders_payload,
+    'get_order': order_payload,
+}
+
+def run_subrequest(adapter, path):
+    """Resolve one batched GET path against the URL map and build its payload"""
+    if not isinstance(path, str):
+        return {"path": path, "status": 400, "body": {"success": False, "message": "Invalid path"}}
+    
+    route, _, query = path.partition('?')
+    try:
+        endpoint, view_args = adapter.match(route, method='GET')
+    except HTTPException as e:
+        return {"path": path, "status": e.code, "body": {"success": False, "message": "Endpoint not found"}}
+    
+    handler = BATCH_HANDLERS.get(endpoint)
+    if handler is None:
+        return {"path": path, "status": 400, "body": {"success": False, "message": "Endpoint not supported in batch"}}
+    
+    try:
+        payload, status = handler(MultiDict(parse_qsl(query)), **view_args)
+    except (UnknownFieldError, InvalidParameterError) as e:
+        payload, status = {"success": False, "message": str(e)}, 400
+    return {"path": path, "status": status, "body": payload}
+
+@app.route('/api/batch', methods=['POST'])
+@expensive
+def batch():
+    """Run several read sub-requests in one call and return them in one response"""
+    body = request.get_json(silent=True)
+    subrequests = body.get('requests') if isinstance(body, dict) else None
+    
+    if not isinstance(subrequests, list) or not subrequests:
+        return jsonify({
+            "success": False,
+            "message": "Expected a non-empty 'requests' list"
+        }), 400
+    
+    if len(subrequests) > MAX_BATCH_SIZE:
+        return jsonify({
+            "success": False,
+            "message": f"At most {MAX_BATCH_SIZE} requests per batch"
+        }), 400
+    
+    adapter = app.url_map.bind('localhost')
+    responses = [
+        run_subrequest(adapter, sub.get('path') if isinstance(sub, dict) else sub)
+        for sub in subrequests
+    ]
+    
+    return jsonify({
+        "success": True,
+        "count": len(responses),
+        "responses": responses
     })
 
 # Statistics endpoint
 @app.route('/api/stats', methods=['GET'])
+@cached
+@expensive
 def get_stats():
     """Get application statistics"""
     total_revenue = sum(order['total'] for order in orders if order['status'] == 'completed')
@@ -305,6 +988,125 @@ def get_stats():
         }
     })
 
+@app.route('/api/stats/revenue', methods=['GET'])
+@cached
+def get_revenue_stats():
+    """Revenue, order count and average order value per time bucket and status"""
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        raise InvalidParameterError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+    
+    # Without explicit bounds, cover every order (the end is exclusive, hence the extra second)
+    span = revenue_rollup.span() or (0, -1)
+    start, end = parse_time_range(request.args, span[0], span[1] + 1)
+    
+    return jsonify({
+        "success": True,
+        "data": revenue_rollup.query(start, end, granularity)
+    })
+
+# Reports: heavy aggregation and exports run in a process pool, off the request workers
+report_manager = ReportManager({'users': users, 'products': products, 'orders': orders}, _write_lock)
+
+def report_view(job):
+    """Job as returned by the reports API, with its result URL and inline JSON result once done"""
+    view = dict(job)
+    if job['status'] == 'done':
+        view['resultUrl'] = f"/api/reports/{job['id']}/result"
+        if job.get('contentType') == 'application/json':
+            body = report_manager.store.read_result(job['id'])
+            view['result'] = json.loads(body) if body is not None else None
+    return view
+
+def report_not_found():
+    return jsonify({
+        "success": False,
+        "message": "Report not found"
+    }), 404
+
+@app.route('/api/reports', methods=['POST'])
+@expensive
+def create_report():
+    """Queue a report job; identical requests against unchanged data reuse the same job"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('params', {}), dict):
+        return jsonify({
+            "success": False,
+            "message": "Invalid JSON data"
+        }), 400
+    
+    if 'type' not in data:
+        return jsonify({
+            "success": False,
+            "message": f"Missing required field: type (one of: {', '.join(REPORTS)})"
+        }), 400
+    
+    try:
+        job = report_manager.submit(data['type'], data.get('params', {}), payload_cache.generation)
+    except ReportBusyError:
+        response = jsonify({
+            "success": False,
+            "message": "Too many reports in progress, try again shortly"
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+    
+    response = jsonify({
+        "success": True,
+        "data": report_view(job)
+    })
+    response.status_code = 200 if job['status'] == 'done' else 202
+    response.headers['Location'] = f"/api/reports/{job['id']}"
+    return response
+
+@app.route('/api/reports/<job_id>', methods=['GET'])
+def get_report(job_id):
+    """Poll a report job"""
+    job = report_manager.get(job_id)
+    if job is None:
+        return report_not_found()
+    
+    return jsonify({
+        "success": True,
+        "data": report_view(job)
+    })
+
+@app.route('/api/reports/<job_id>/result', methods=['GET'])
+def get_report_result(job_id):
+    """Download a finished report"""
+    job = report_manager.get(job_id)
+    if job is None:
+        return report_not_found()
+    
+    if job['status'] != 'done':
+        return jsonify({
+            "success": False,
+            "message": f"Report is {job['status']}",
+            "data": report_view(job)
+        }), 409
+    
+    body = report_manager.store.read_result(job_id)
+    if body is None:
+        return report_not_found()
+    
+    response = Response(body, mimetype=job['contentType'])
+    if job['contentType'] == 'text/csv':
+        response.headers['Content-Disposition'] = f'attachment; filename="{job["type"]}"'
+    return response
+
+@app.route('/api/reports/<job_id>', methods=['DELETE'])
+def cancel_report(job_id):
+    """Cancel a queued or running report job"""
+    job = report_manager.cancel(job_id)
+    if job is None:
+        return report_not_found()
+    
+    return jsonify({
+        "success": True,
+        "data": report_view(job)
+    })
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -313,8 +1115,8 @@ def not_found(error):
         "success": False,
         "message": "Endpoint not found",
         "available_endpoints": [
-            "/", "/health", "/api/users", "/api/products", 
-            "/api/orders", "/api/docs", "/api/stats"
+            "/", "/health", "/livez", "/api/users", "/api/products", 
+            "/api/orders", "/api/events", "/api/batch", "/api/docs", "/api/stats", "/api/reports"
         ]
     }), 404
 
@@ -326,6 +1128,16 @@ def internal_error(error):
         "message": "Internal server error"
     }), 500
 
+@app.errorhandler(UnknownFieldError)
+@app.errorhandler(InvalidParameterError)
+@app.errorhandler(ReportError)
+def invalid_parameter(error):
+    """Handle unknown projection fields and malformed query parameters"""
+    return jsonify({
+        "success": False,
+        "message": str(error)
+    }), 400
+
 @app.errorhandler(400)
 def bad_request(error):
     """Handle 400 errors"""
@@ -334,6 +1146,21 @@ def bad_request(error):
         "message": "Bad request"
     }), 400
 
+# Worker warm-up
+# Cheap requests that still go through routing, projection and JSON encoding; full lists and
+# /api/stats would serialize (and payload-cache) the whole dataset in every worker before it serves
+WARM_UP_PATHS = ['/livez', '/', '/api/docs', '/api/users?limit=1', '/api/users/1',
+                 '/api/products?limit=1', '/api/orders?limit=1&fields=id']
+
+def warm_up():
+    """Pay first-request costs (route compilation, JSON encoding) before serving traffic"""
+    app.url_map.update()
+    static_json('livez', LIVEZ)
+    static_json('api_docs', API_DOCS)
+    with app.test_client() as client:
+        for path in WARM_UP_PATHS:
+            client.get(path)
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_ENV') == 'development'
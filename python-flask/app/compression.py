@@ -0,0 +1,132 @@
+"""
+Response compression and precompressed payload caching for Flask application
+"""
+import gzip
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+# Optional codecs: gzip is always available, brotli/zstd only when installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Bodies smaller than this are sent as-is; compressing them costs more than it saves
+MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+ZSTD_LEVEL = int(os.environ.get('COMPRESS_ZSTD_LEVEL', 3))
+
+COMPRESSIBLE_TYPES = {'application/json', 'text/plain', 'text/html', 'text/csv'}
+
+COMPRESSORS = {
+    'gzip': lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0),
+}
+if brotli is not None:
+    COMPRESSORS['br'] = lambda data: brotli.compress(data, quality=BROTLI_QUALITY)
+if zstandard is not None:
+    COMPRESSORS['zstd'] = lambda data: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+# Server preference when the client accepts several encodings with the same weight
+PREFERENCE = [encoding for encoding in ('zstd', 'br', 'gzip') if encoding in COMPRESSORS]
+
+
+@lru_cache(maxsize=128)
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick the best available encoding for an Accept-Encoding header, or None"""
+    weights = {}
+    for part in accept_encoding.lower().split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in PREFERENCE:
+        quality = weights.get(encoding, weights.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress data with the given content coding"""
+    return COMPRESSORS[encoding](data)
+
+
+class EncodedPayload:
+    """A serialized response body together with its lazily built compressed variants"""
+
+    __slots__ = ('body', 'variants', '_lock')
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.variants: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def encode(self, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """Return (body, content coding) for the negotiated encoding, compressing at most once"""
+        if encoding is None or len(self.body) < MIN_SIZE:
+            return self.body, None
+        variant = self.variants.get(encoding)
+        if variant is None:
+            with self._lock:
+                variant = self.variants.get(encoding)
+                if variant is None:
+                    variant = self.variants[encoding] = compress(self.body, encoding)
+        return variant, encoding
+
+
+class PayloadCache:
+    """Bounded LRU of serialized payloads keyed by request path, dropped wholesale on writes"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, EncodedPayload]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[EncodedPayload]:
+        """Return the cached payload for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: EncodedPayload, generation: int) -> None:
+        """Store a payload built while the cache was at ``generation``; stale builds are discarded"""
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop every cached payload; call after any write to the underlying data"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
@@ -2,9 +2,11 @@
 Data models and utilities for Flask application
 """
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from operator import attrgetter
+from typing import Iterable, List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import random
+from projection import Schema
 
 @dataclass
 class User:
@@ -22,16 +24,9 @@ class User:
         if self.last_login is None:
             self.last_login = datetime.now() - timedelta(hours=random.randint(1, 72))
     
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            'id': self.id,
-            'name': self.name,
-            'email': self.email,
-            'role': self.role,
-            'created_at': self.created_at.isoformat(),
-            'last_login': self.last_login.isoformat(),
-            'is_admin': self.role == 'admin'
-        }
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Serialize the user; derived fields are only computed when selected"""
+        return USER_SCHEMA.projector(tuple(fields) if fields is not None else None)(self)
 
 @dataclass 
 class Product:
@@ -50,17 +45,9 @@ class Product:
         if not self.description:
             self.description = f"High-quality {self.name.lower()} in the {self.category.lower()} category"
     
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            'id': self.id,
-            'name': self.name,
-            'price': self.price,
-            'category': self.category,
-            'in_stock': self.in_stock,
-            'description': self.description,
-            'stock_quantity': self.stock_quantity,
-            'price_formatted': f"${self.price:.2f}"
-        }
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Serialize the product; derived fields are only computed when selected"""
+        return PRODUCT_SCHEMA.projector(tuple(fields) if fields is not None else None)(self)
 
 @dataclass
 class Order:
@@ -76,16 +63,37 @@ class Order:
         if self.created_at is None:
             self.created_at = datetime.now() - timedelta(days=random.randint(0, 30))
     
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'product_ids': self.product_ids,
-            'total_amount': self.total_amount,
-            'status': self.status,
-            'created_at': self.created_at.isoformat(),
-            'total_formatted': f"${self.total_amount:.2f}"
-        }
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Serialize the order; derived fields are only computed when selected"""
+        return ORDER_SCHEMA.projector(tuple(fields) if fields is not None else None)(self)
+
+# Serialization schemas; derived fields are computed per record only when projected
+USER_SCHEMA = Schema(
+    ['id', 'name', 'email', 'role'],
+    derived={
+        'created_at': lambda u: u.created_at.isoformat(),
+        'last_login': lambda u: u.last_login.isoformat(),
+        'is_admin': lambda u: u.role == 'admin',
+    },
+    getter=attrgetter
+)
+
+PRODUCT_SCHEMA = Schema(
+    ['id', 'name', 'price', 'category', 'in_stock', 'description', 'stock_quantity'],
+    derived={
+        'price_formatted': lambda p: f"${p.price:.2f}",
+    },
+    getter=attrgetter
+)
+
+ORDER_SCHEMA = Schema(
+    ['id', 'user_id', 'product_ids', 'total_amount', 'status'],
+    derived={
+        'created_at': lambda o: o.created_at.isoformat(),
+        'total_formatted': lambda o: f"${o.total_amount:.2f}",
+    },
+    getter=attrgetter
+)
 
 # Sample data generators
 def generate_sample_users() -> List[User]:
@@ -128,18 +136,21 @@ def generate_sample_orders() -> List[Order]:
     ]
 
 # Utility functions
+
 def filter_users_by_role(users: List[User], role: Optional[str] = None) -> List[User]:
     """Filter users by role"""
     if not role:
         return users
-    return [user for user in users if user.role.lower() == role.lower()]
+    role = role.lower()
+    return [user for user in users if user.role.lower() == role]
 
 def filter_products_by_category(products: List[Product], category: Optional[str] = None, in_stock_only: bool = False) -> List[Product]:
     """Filter products by category and stock status"""
     filtered = products
     
     if category:
-        filtered = [p for p in filtered if p.category.lower() == category.lower()]
+        category = category.lower()
+        filtered = [p for p in filtered if p.category.lower() == category]
     
     if in_stock_only:
         filtered = [p for p in filtered if p.in_stock]
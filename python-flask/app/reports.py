@@ -0,0 +1,470 @@
+"""
+Background report generation in a process pool for Flask application
+"""
+import atexit
+import csv
+import io
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from analytics import format_timestamp, parse_timestamp
+from snapshot import Snapshot, SnapshotWriter
+
+# Report processes per request worker; each job runs in one of them
+REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', 1))
+# Jobs queued or running per request worker before new ones are refused
+REPORT_MAX_PENDING = int(os.environ.get('REPORT_MAX_PENDING', 8))
+# Identical requests against unchanged data reuse a finished job from this many
+REPORT_CACHE_SIZE = int(os.environ.get('REPORT_CACHE_SIZE', 32))
+# Finished jobs and their results are deleted after this long
+REPORT_TTL_SECONDS = float(os.environ.get('REPORT_TTL_SECONDS', 3600))
+# Shared by every worker and report process; /tmp is a tmpfs in docker-compose
+REPORT_DIR = os.environ.get('REPORT_DIR', os.path.join(tempfile.gettempdir(), 'reports'))
+
+# Reports poll for cancellation once per this many rows
+CANCEL_CHECK_ROWS = 65536
+
+JOB_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+FINISHED = ('done', 'failed', 'cancelled')
+
+
+class ReportError(ValueError):
+    """Raised for an unknown report type or invalid report parameters"""
+
+
+class ReportBusyError(Exception):
+    """Raised when a worker already has REPORT_MAX_PENDING jobs in flight"""
+
+
+class ReportCancelled(Exception):
+    """Raised inside a report process when its job was cancelled while running"""
+
+
+class Report(NamedTuple):
+    """A report type: its function, the columns it reads and its allowed parameters"""
+    run: Callable
+    columns: Mapping[str, Tuple[str, ...]]
+    content_type: str
+    params: Tuple[str, ...] = ()
+
+
+def _chunks(rows: int, check: Callable[[], None]):
+    """Row ranges of CANCEL_CHECK_ROWS, checking for cancellation before each one"""
+    for start in range(0, rows, CANCEL_CHECK_ROWS):
+        check()
+        yield start, min(rows, start + CANCEL_CHECK_ROWS)
+
+
+def _count(values: List[Any]) -> Dict[Any, int]:
+    counts: Dict[Any, int] = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return counts
+
+
+def stats_report(data: Snapshot, params: Mapping[str, str], check: Callable[[], None]) -> bytes:
+    """Application statistics (as /api/stats) plus average completed order value"""
+    totals = data.column('orders.total')
+    statuses = data.column('orders.status')
+    revenue = 0.0
+    for start, end in _chunks(len(totals), check):
+        revenue += sum(total for total, status in zip(totals[start:end], statuses[start:end])
+                       if status == 'completed')
+    by_status = _count(statuses)
+    check()
+    in_stock = data.column('products.inStock')
+    categories = data.column('products.category')
+    roles = _count(data.column('users.role'))
+    completed = by_status.get('completed', 0)
+    return json.dumps({
+        "totalUsers": sum(roles.values()),
+        "totalProducts": len(in_stock),
+        "totalOrders": len(totals),
+        "revenue": {
+            "total": round(revenue, 2),
+            "completed_orders": completed,
+            "pending_orders": by_status.get('pending', 0),
+            "average_order_value": round(revenue / completed, 2) if completed else 0,
+            "by_status": by_status
+        },
+        "products": {
+            "in_stock": sum(in_stock),
+            "out_of_stock": len(in_stock) - sum(in_stock),
+            "categories": sorted(set(categories))
+        },
+        "users": {
+            "by_role": roles
+        }
+    }).encode()
+
+
+ORDER_CSV_COLUMNS = ('id', 'userId', 'productId', 'quantity', 'total', 'status', 'createdAt')
+
+
+def orders_csv_report(data: Snapshot, params: Mapping[str, str], check: Callable[[], None]) -> bytes:
+    """Orders as CSV, optionally filtered by status and a createdAt range"""
+    columns = [data.column(f"orders.{name}") for name in ORDER_CSV_COLUMNS]
+    statuses = columns[5]
+    status = params.get('status')
+    start = parse_timestamp(params['from']) if 'from' in params else None
+    end = parse_timestamp(params['to']) if 'to' in params else None
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ORDER_CSV_COLUMNS)
+    for first, last in _chunks(len(statuses), check):
+        for row in zip(*(column[first:last] for column in columns)):
+            if status and row[5] != status:
+                continue
+            if start is not None or end is not None:
+                timestamp = parse_timestamp(row[6])
+                if (start is not None and timestamp < start) or (end is not None and timestamp >= end):
+                    continue
+            writer.writerow(row)
+    return buffer.getvalue().encode()
+
+
+REPORTS = {
+    'stats': Report(stats_report, {
+        'users': ('role',),
+        'products': ('inStock', 'category'),
+        'orders': ('total', 'status'),
+    }, 'application/json'),
+    'orders.csv': Report(orders_csv_report, {'orders': ORDER_CSV_COLUMNS}, 'text/csv', ('status', 'from', 'to')),
+}
+
+
+def _now() -> str:
+    return format_timestamp(time.time())
+
+
+class ReportStore:
+    """Job state and results as files, so any worker can answer polls for any job"""
+
+    def __init__(self, directory: str = REPORT_DIR):
+        self.directory = directory
+
+    def path(self, job_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.{suffix}")
+
+    def _write(self, path: str, data: bytes) -> None:
+        """Write via a temp file and rename, so readers never see a partial file"""
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.report-')
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(data)
+        os.replace(temp_path, path)
+
+    def save(self, job: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._write(self.path(job['id'], 'json'), json.dumps(job).encode())
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job metadata, or None for unknown (or malformed) ids"""
+        if not JOB_ID_RE.match(job_id):
+            return None
+        try:
+            with open(self.path(job_id, 'json'), 'rb') as handle:
+                job = json.load(handle)
+        except FileNotFoundError:
+            return None
+        if job['status'] not in FINISHED and self.cancel_requested(job_id):
+            job['cancelRequested'] = True
+        return job
+
+    def update(self, job_id: str, **fields) -> None:
+        job = self.get(job_id)
+        if job is not None:
+            job.pop('cancelRequested', None)
+            job.update(fields)
+            self.save(job)
+
+    def write_result(self, job_id: str, body: bytes) -> None:
+        self._write(self.path(job_id, 'result'), body)
+
+    def read_result(self, job_id: str) -> Optional[bytes]:
+        """Result body, or None once it has been purged"""
+        try:
+            with open(self.path(job_id, 'result'), 'rb') as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return None
+
+    def request_cancel(self, job_id: str) -> None:
+        """Leave a marker the report process polls for"""
+        with open(self.path(job_id, 'cancel'), 'wb'):
+            pass
+
+    def cancel_requested(self, job_id: str) -> bool:
+        return os.path.exists(self.path(job_id, 'cancel'))
+
+    def purge(self, ttl: float) -> None:
+        """Delete job files older than ttl seconds"""
+        cutoff = time.time() - ttl
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.name.endswith(('.json', '.result', '.cancel')):
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+def run_report(directory: str, job_id: str, name: str, params: Dict[str, str], data_path: str) -> None:
+    """Report process entry point: read the shared columns, run the report and record the outcome"""
+    store = ReportStore(directory)
+
+    def check():
+        if store.cancel_requested(job_id):
+            raise ReportCancelled()
+
+    try:
+        check()
+        store.update(job_id, status='running', startedAt=_now())
+        report = REPORTS[name]
+        with Snapshot(data_path) as data:
+            body = report.run(data, params, check)
+        store.write_result(job_id, body)
+        store.update(job_id, status='done', finishedAt=_now(), contentType=report.content_type, size=len(body))
+    except ReportCancelled:
+        store.update(job_id, status='cancelled', finishedAt=_now())
+    except Exception as error:
+        store.update(job_id, status='failed', finishedAt=_now(), error=str(error))
+
+
+def _report_columns() -> Dict[str, Tuple[str, ...]]:
+    """Every table column some report reads"""
+    columns: Dict[str, set] = {}
+    for report in REPORTS.values():
+        for table, keys in report.columns.items():
+            columns.setdefault(table, set()).update(keys)
+    return {table: tuple(sorted(keys)) for table, keys in columns.items()}
+
+
+class ReportManager:
+    """Submits report jobs to a bounded process pool, sharing data through a memory-mapped file
+
+    The columns reports read are exported to a snapshot file in REPORT_DIR (a tmpfs in
+    docker-compose); report processes memory-map it instead of receiving pickled copies of the
+    dataset. Exports run on one background thread, never the request thread: the data lock is
+    held only to copy the record lists, and every job waiting for an export shares the newest
+    file, so a stream of writes costs one export per batch of submits rather than one each.
+    """
+
+    def __init__(self, tables: Mapping[str, List[Dict[str, Any]]], lock: threading.Lock,
+                 store: Optional[ReportStore] = None, workers: int = REPORT_WORKERS,
+                 max_pending: int = REPORT_MAX_PENDING, cache_size: int = REPORT_CACHE_SIZE):
+        self.tables = tables
+        self.data_lock = lock
+        self.store = store or ReportStore()
+        self.workers = workers
+        self.max_pending = max_pending
+        self.cache_size = cache_size
+        self._columns = _report_columns()
+        self._cache: 'OrderedDict[tuple, str]' = OrderedDict()
+        # Jobs in flight: job id -> pool future, or None while waiting for its data export
+        self._futures: Dict[str, Any] = {}
+        # Shared data file per generation: generation -> [path, jobs still using it]
+        self._data: Dict[int, list] = {}
+        self._generation: Optional[int] = None
+        # Newest generation any job has asked for; an export covers at least this one
+        self._requested = -1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._exporter: Optional[ThreadPoolExecutor] = None
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Created on first use, so it is never inherited across gunicorn's fork
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def _export_thread(self) -> ThreadPoolExecutor:
+        # Likewise created on first use; threads do not survive a fork
+        if self._exporter is None:
+            self._exporter = ThreadPoolExecutor(1, thread_name_prefix='report-export')
+        return self._exporter
+
+    def _export(self, generation: int) -> Tuple[int, str]:
+        """(generation, path) of a shared data file at least as new as generation, holding it for a job
+
+        Runs on the export thread. The record lists are copied under the data lock and
+        serialized outside it, so writers only wait for the copy.
+        """
+        with self._lock:
+            current = self._generation
+            if current is not None and current >= generation:
+                entry = self._data[current]
+                entry[1] += 1
+                return current, entry[0]
+            # Everything requested so far was observed before this copy, so it covers them all
+            generation = self._requested
+        with self.data_lock:
+            tables = {table: list(self.tables[table]) for table in self._columns}
+        writer = SnapshotWriter()
+        for table, keys in self._columns.items():
+            records = tables[table]
+            for key in keys:
+                try:
+                    values = list(map(itemgetter(key), records))
+                except KeyError:
+                    values = [record.get(key) for record in records]
+                writer.add(f"{table}.{key}", values)
+        path = os.path.join(self.store.directory, f"data-{os.getpid()}-{generation}.snapshot")
+        writer.write(path, str(generation))
+        with self._lock:
+            self._data[generation] = [path, 1]
+            previous = self._generation
+            self._generation = generation
+            if previous is not None:
+                self._release(previous, 0)
+        return generation, path
+
+    def _release(self, generation: int, jobs: int = 1) -> None:
+        """Drop a job's hold on a data file; superseded files are deleted once unused"""
+        entry = self._data[generation]
+        entry[1] -= jobs
+        if entry[1] <= 0 and generation != self._generation:
+            del self._data[generation]
+            try:
+                os.unlink(entry[0])
+            except FileNotFoundError:
+                pass
+
+    def submit(self, name: str, params: Mapping[str, Any], generation: int) -> Dict[str, Any]:
+        """Queue a report, or return the cached job for the same request and data generation"""
+        report = REPORTS.get(name)
+        if report is None:
+            raise ReportError(f"Unknown report type: {name}; expected one of: {', '.join(REPORTS)}")
+        unknown = set(params) - set(report.params)
+        if unknown:
+            raise ReportError(f"Unknown parameters for {name}: {', '.join(sorted(unknown))}")
+        params = {key: str(value) for key, value in params.items()}
+        for key in ('from', 'to'):
+            if key in params:
+                try:
+                    parse_timestamp(params[key])
+                except ValueError:
+                    raise ReportError(f"{key} must be an ISO 8601 timestamp or epoch seconds")
+
+        key = (name, tuple(sorted(params.items())), generation)
+        with self._lock:
+            job_id = self._cache.get(key)
+            if job_id is not None:
+                job = self.store.get(job_id)
+                if job is not None and job['status'] not in ('failed', 'cancelled'):
+                    self._cache.move_to_end(key)
+                    return job
+            if len(self._futures) >= self.max_pending:
+                raise ReportBusyError()
+            self._purge()
+
+            job = {
+                "id": uuid.uuid4().hex,
+                "type": name,
+                "params": params,
+                "status": "queued",
+                "createdAt": _now()
+            }
+            self.store.save(job)
+            self._requested = max(self._requested, generation)
+            self._futures[job['id']] = None
+            self._cache[key] = job['id']
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            try:
+                self._export_thread().submit(self._start, job['id'], name, params, generation)
+            except Exception:
+                self._futures.pop(job['id'], None)
+                self.store.update(job['id'], status='failed', finishedAt=_now(), error='Report pool unavailable')
+                raise
+        return job
+
+    def _start(self, job_id: str, name: str, params: Dict[str, str], generation: int) -> None:
+        """Export thread: get a shared data file for the job, then hand it to the process pool"""
+        data_generation = None
+        try:
+            if self.store.cancel_requested(job_id):
+                with self._lock:
+                    self._futures.pop(job_id, None)
+                self.store.update(job_id, status='cancelled', finishedAt=_now())
+                return
+            data_generation, data_path = self._export(generation)
+            task = (run_report, self.store.directory, job_id, name, params, data_path)
+            with self._lock:
+                try:
+                    future = self._pool().submit(*task)
+                except BrokenProcessPool:
+                    # A report process died (e.g. OOM-killed); start a fresh pool
+                    self._executor = None
+                    future = self._pool().submit(*task)
+                self._futures[job_id] = future
+        except Exception as error:
+            with self._lock:
+                self._futures.pop(job_id, None)
+                if data_generation is not None:
+                    self._release(data_generation)
+            self.store.update(job_id, status='failed', finishedAt=_now(), error=f"Report could not start: {error}")
+            return
+        future.add_done_callback(partial(self._finished, job_id, data_generation))
+
+    def _finished(self, job_id: str, generation: int, future) -> None:
+        with self._lock:
+            self._futures.pop(job_id, None)
+            self._release(generation)
+        if future.cancelled():
+            self.store.update(job_id, status='cancelled', finishedAt=_now())
+        elif future.exception() is not None:
+            # The report process died (e.g. killed for memory) before recording an outcome
+            self.store.update(job_id, status='failed', finishedAt=_now(), error=str(future.exception()))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued or running job; finished jobs are returned unchanged"""
+        job = self.store.get(job_id)
+        if job is None or job['status'] in FINISHED:
+            return job
+        future = self._futures.get(job_id)
+        if future is None or not future.cancel():
+            # Exporting, running, or owned by another worker: the export thread or report
+            # process stops at its next check
+            self.store.request_cancel(job_id)
+        return self.store.get(job_id)
+
+    def _purge(self) -> None:
+        """Delete expired job files at most once a minute; the caller holds _lock"""
+        now = time.monotonic()
+        if now - self._last_purge >= 60:
+            self._last_purge = now
+            self.store.purge(REPORT_TTL_SECONDS)
+
+    def shutdown(self) -> None:
+        """Stop the pool and delete this worker's shared data files"""
+        if self._exporter is not None:
+            self._exporter.shutdown(wait=False, cancel_futures=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        for path, _ in self._data.values():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
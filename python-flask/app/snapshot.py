@@ -0,0 +1,238 @@
+"""
+Columnar binary snapshots of the in-memory dataset for Flask application
+"""
+import json
+import mmap
+import os
+import sys
+import tempfile
+from array import array
+from itertools import accumulate
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+SNAPSHOT_ENABLED = os.environ.get('SNAPSHOT_ENABLED', 'true').lower() == 'true'
+# Must be writable; the container root is read-only, so point this at a volume or /tmp
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', '/tmp/snapshots')
+
+# Bump when the layout changes; older files are then ignored and rewritten
+MAGIC = b'FSNAP001'
+ALIGN = 8
+
+# Placeholder for keys a record does not have (sparse columns only)
+MISSING = object()
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is unreadable or does not match what the caller expects"""
+
+
+def source_key(*paths: str) -> str:
+    """Fingerprint of the files the dataset is built from; a snapshot with another key is stale"""
+    parts = []
+    for path in paths:
+        stat = os.stat(path)
+        parts.append(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}")
+    return ','.join(parts)
+
+
+def _column_kind(values: Sequence) -> str:
+    """Storage kind for a column: typed array when every value fits one, else JSON text"""
+    if isinstance(values, array):
+        return values.typecode
+    types = set(map(type, values))
+    if types == {bool}:
+        return '?'
+    if types == {int}:
+        return 'q' if -2**63 <= min(values) and max(values) < 2**63 else 'j'
+    if types == {float}:
+        return 'd'
+    if types <= {str}:
+        return 's'
+    return 'j'
+
+
+class SnapshotWriter:
+    """Collects columns in memory and writes them as one aligned, memory-mappable file"""
+
+    def __init__(self):
+        self.columns: Dict[str, Dict[str, Any]] = {}
+        self.tables: Dict[str, Dict[str, Any]] = {}
+        self._segments: List[bytes] = []
+        self._size = 0
+
+    def _segment(self, data) -> List[int]:
+        data = bytes(data)
+        offset = self._size
+        self._segments.append(data)
+        padding = -len(data) % ALIGN
+        if padding:
+            self._segments.append(b'\0' * padding)
+        self._size += len(data) + padding
+        return [offset, len(data)]
+
+    def add(self, name: str, values: Sequence) -> None:
+        """Store one column; numbers become packed arrays, strings one UTF-8 blob plus offsets"""
+        kind = _column_kind(values)
+        if kind in ('s', 'j'):
+            if kind == 'j':
+                values = ['' if value is MISSING else json.dumps(value, separators=(',', ':')) for value in values]
+            # Character (not byte) offsets, so the blob is decoded once and sliced
+            offsets = array('q', accumulate(map(len, values), initial=0))
+            segments = [self._segment(offsets), self._segment(''.join(values).encode())]
+        elif kind == '?':
+            segments = [self._segment(array('b', values))]
+        else:
+            segments = [self._segment(array(kind, values))]
+        self.columns[name] = {"kind": kind, "rows": len(values), "segments": segments}
+
+    def add_group(self, prefix: str, columns: Mapping[str, Sequence]) -> None:
+        """Store several related columns (an exported index) under a common prefix"""
+        for name, values in columns.items():
+            self.add(f"{prefix}.{name}", values)
+
+    def add_table(self, name: str, records: Sequence[Mapping[str, Any]]) -> None:
+        """Store a list of flat dicts column by column"""
+        keys = list(dict.fromkeys(key for record in records for key in record))
+        sparse = False
+        for key in keys:
+            values = [record.get(key, MISSING) for record in records]
+            sparse = sparse or any(value is MISSING for value in values)
+            self.add(f"{name}.{key}", values)
+        self.tables[name] = {"keys": keys, "rows": len(records), "sparse": sparse}
+
+    def write(self, path: str, key: str) -> None:
+        """Write atomically: a temp file in the same directory is fsynced, then renamed over path"""
+        header = json.dumps({
+            "key": key,
+            "byteorder": sys.byteorder,
+            "columns": self.columns,
+            "tables": self.tables
+        }, separators=(',', ':')).encode()
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(MAGIC)
+                handle.write(len(header).to_bytes(8, 'little'))
+                handle.write(header)
+                handle.write(b'\0' * (-len(header) % ALIGN))
+                handle.writelines(self._segments)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        # Persist the rename itself; not every filesystem allows fsync on a directory
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+
+
+class Snapshot:
+    """A memory-mapped snapshot; columns are decoded straight from the mapping on request"""
+
+    def __init__(self, path: str, key: Optional[str] = None):
+        with open(path, 'rb') as handle:
+            try:
+                self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise SnapshotError(f"Empty snapshot: {path}")
+        try:
+            if self._mmap[:len(MAGIC)] != MAGIC:
+                raise SnapshotError(f"Not a snapshot or an older format: {path}")
+            header_size = int.from_bytes(self._mmap[8:16], 'little')
+            header = json.loads(self._mmap[16:16 + header_size])
+            if header['byteorder'] != sys.byteorder:
+                raise SnapshotError(f"Snapshot was written on a {header['byteorder']}-endian machine")
+            if key is not None and header['key'] != key:
+                raise SnapshotError("Snapshot is stale")
+        except BaseException:
+            self._mmap.close()
+            raise
+        self.columns: Dict[str, Dict[str, Any]] = header['columns']
+        self.tables: Dict[str, Dict[str, Any]] = header['tables']
+        self._data_start = 16 + header_size + (-header_size % ALIGN)
+
+    @classmethod
+    def open(cls, path: str, key: Optional[str] = None) -> Optional['Snapshot']:
+        """Open path, or None when there is no snapshot yet; unreadable paths raise SnapshotError"""
+        try:
+            return cls(path, key)
+        except FileNotFoundError:
+            return None
+        except OSError as error:
+            raise SnapshotError(f"Cannot read snapshot: {error}") from error
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def _read(self, segment: List[int], typecode: Optional[str] = None):
+        start = self._data_start + segment[0]
+        end = start + segment[1]
+        if end > len(self._mmap):
+            raise SnapshotError("Snapshot is truncated")
+        with memoryview(self._mmap) as view, view[start:end] as data:
+            if typecode is None:
+                return str(data, 'utf-8')
+            try:
+                values = data.cast(typecode)
+            except (TypeError, ValueError) as error:
+                raise SnapshotError(f"Snapshot segment does not hold {typecode!r} values: {error}") from error
+            with values:
+                return values.tolist()
+
+    def column(self, name: str) -> List[Any]:
+        """Decode one column into a list"""
+        try:
+            meta = self.columns[name]
+        except KeyError:
+            raise SnapshotError(f"Snapshot has no column {name}")
+        kind, segments = meta['kind'], meta['segments']
+        if kind in ('s', 'j'):
+            offsets = self._read(segments[0], 'q')
+            text = self._read(segments[1])
+            values = [text[start:end] for start, end in zip(offsets, offsets[1:])]
+            if kind == 'j':
+                values = [json.loads(value) if value else MISSING for value in values]
+            return values
+        if kind == '?':
+            return list(map(bool, self._read(segments[0], 'b')))
+        return self._read(segments[0], kind)
+
+    def group(self, prefix: str) -> Dict[str, List[Any]]:
+        """Every column stored by ``add_group(prefix, ...)``, keyed by its short name"""
+        start = prefix + '.'
+        return {name[len(start):]: self.column(name) for name in self.columns if name.startswith(start)}
+
+    def table(self, name: str) -> List[Dict[str, Any]]:
+        """Rebuild a table stored by ``add_table`` as a list of dicts"""
+        try:
+            meta = self.tables[name]
+        except KeyError:
+            raise SnapshotError(f"Snapshot has no table {name}")
+        keys = meta['keys']
+        columns = [self.column(f"{name}.{key}") for key in keys]
+        records = [dict(zip(keys, row)) for row in zip(*columns)] if keys else [{} for _ in range(meta['rows'])]
+        if meta['sparse']:
+            for record in records:
+                for key in [key for key, value in record.items() if value is MISSING]:
+                    del record[key]
+        return records
@@ -0,0 +1,34 @@
+"""
+Fixtures for the Flask/Django contract suite
+"""
+import pytest
+
+import contract
+
+# scenario name -> {"flask": ms, "django": ms}, printed after the run
+LATENCIES = {}
+
+
+@pytest.fixture(scope='session')
+def apps():
+    """Both WSGI callables, loaded once with the shared fixture data"""
+    return {"flask": contract.load_flask(), "django": contract.load_django()}
+
+
+@pytest.fixture
+def record_latency():
+    def record(scenario, stack, elapsed_ms):
+        LATENCIES.setdefault(scenario, {})[stack] = elapsed_ms
+    return record
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Per-scenario latency of both apps side by side (single cold-ish calls; see benchmarks/parity.py)"""
+    if not LATENCIES:
+        return
+    terminalreporter.section('flask vs django latency (ms)')
+    terminalreporter.write_line(f"{'scenario':<28} {'flask':>9} {'django':>9}")
+    for name, timings in LATENCIES.items():
+        terminalreporter.write_line(
+            f"{name:<28} {timings.get('flask', float('nan')):>9.3f} {timings.get('django', float('nan')):>9.3f}"
+        )
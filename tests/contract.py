@@ -0,0 +1,229 @@
+"""
+Shared contract scenarios for the Flask and Django apps
+
+Both apps are loaded in-process and called through their WSGI callables with the
+same fixture data. Each scenario is written once in the Flask app's terms
+(``/api/users``, ``inStock``) and translated for Django (``/api/users/``,
+``in_stock``); responses are normalized so that only real behaviour differences
+remain. Used by tests/test_contract.py and benchmarks/parity.py.
+"""
+import copy
+import io
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FLASK_DIR = os.path.join(ROOT, 'python-flask', 'app')
+DJANGO_DIR = os.path.join(ROOT, 'django', 'app')
+
+# Keep side effects out of the comparison: no snapshot files, no 429s, no log lines
+os.environ['SNAPSHOT_ENABLED'] = 'false'
+os.environ['RATE_LIMIT_ENABLED'] = 'false'
+os.environ['ACCESS_LOG_ENABLED'] = 'false'
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'djangoapp.settings')
+
+# Roles both apps count in /api/stats (the Flask app only knows these three)
+FIXTURE_USERS = [
+    {"id": 1, "name": "Alice Johnson", "email": "alice@example.com", "role": "admin"},
+    {"id": 2, "name": "Bob Smith", "email": "bob@example.com", "role": "user"},
+    {"id": 3, "name": "Carol Brown", "email": "carol@example.com", "role": "user"},
+    {"id": 4, "name": "David Wilson", "email": "david@example.com", "role": "moderator"},
+    {"id": 5, "name": "Eva Martinez", "email": "eva@example.com", "role": "user"},
+]
+
+FIXTURE_PRODUCTS = [
+    {"id": 1, "name": "Laptop", "price": 999.99, "category": "Electronics", "inStock": True},
+    {"id": 2, "name": "Django Book", "price": 49.99, "category": "Education", "inStock": True},
+    {"id": 3, "name": "Coding Chair", "price": 199.99, "category": "Furniture", "inStock": False},
+    {"id": 4, "name": "Phone", "price": 699.99, "category": "Electronics", "inStock": True},
+    {"id": 5, "name": "Web Development Course", "price": 79.99, "category": "Education", "inStock": True},
+]
+
+# Flask name -> Django name, for record keys, query parameters and ``fields=`` values
+DJANGO_NAMES = {'inStock': 'in_stock'}
+FLASK_NAMES = {django: flask for flask, django in DJANGO_NAMES.items()}
+
+# Response keys that are informational in one app only
+IGNORED_KEYS = {'filters', 'timestamp', 'available_endpoints'}
+
+
+def load_flask():
+    """Import the Flask app and swap in the fixture data; returns its WSGI callable"""
+    if FLASK_DIR not in sys.path:
+        sys.path.insert(0, FLASK_DIR)
+    import app as flask_app
+    flask_app.users[:] = copy.deepcopy(FIXTURE_USERS)
+    flask_app.products[:] = copy.deepcopy(FIXTURE_PRODUCTS)
+    flask_app.rebuild_indexes()
+    flask_app.payload_cache.invalidate()
+    return flask_app.app
+
+
+def load_django():
+    """Set up Django and swap in the fixture data; returns its WSGI callable"""
+    if DJANGO_DIR not in sys.path:
+        sys.path.insert(0, DJANGO_DIR)
+    from django.core.wsgi import get_wsgi_application
+    application = get_wsgi_application()
+    # 4xx scenarios would otherwise log a warning per request
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    from djangoapp import views
+    from djangoapp.compression import payload_cache
+    views.USERS[:] = copy.deepcopy(FIXTURE_USERS)
+    views.PRODUCTS[:] = [rename_keys(product, DJANGO_NAMES) for product in copy.deepcopy(FIXTURE_PRODUCTS)]
+    views.rebuild_indexes()
+    payload_cache.invalidate()
+    return application
+
+
+def rename_keys(value: Any, names: Dict[str, str]) -> Any:
+    """Recursively rename dict keys"""
+    if isinstance(value, dict):
+        return {names.get(key, key): rename_keys(item, names) for key, item in value.items()}
+    if isinstance(value, list):
+        return [rename_keys(item, names) for item in value]
+    return value
+
+
+class Response(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+    def json(self) -> Optional[Any]:
+        if not self.headers.get('content-type', '').startswith('application/json'):
+            return None
+        return json.loads(self.body)
+
+
+def call(application: Callable, path: str, query: str = '', method: str = 'GET') -> Response:
+    """Run one request through a WSGI callable"""
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'wsgi.input': io.BytesIO(),
+    }
+    setup_testing_defaults(environ)
+    captured = {}
+
+    def start_response(status, headers, exc_info=None):
+        captured['status'] = int(status.split(' ', 1)[0])
+        captured['headers'] = {name.lower(): value for name, value in headers}
+        return lambda data: None
+
+    result = application(environ, start_response)
+    try:
+        body = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return Response(captured['status'], captured['headers'], body)
+
+
+def normalize(body: Any) -> Any:
+    """Flask naming, without keys that only one app reports"""
+    if isinstance(body, dict):
+        return {
+            FLASK_NAMES.get(key, key): normalize(value)
+            for key, value in body.items() if key not in IGNORED_KEYS
+        }
+    if isinstance(body, list):
+        return [normalize(item) for item in body]
+    return body
+
+
+def normalize_stats(body: Any) -> Any:
+    """The statistics both apps report, in one shape"""
+    if not isinstance(body, dict) or not body.get('success'):
+        return body
+    data = body['data']
+    if 'totalUsers' in data:
+        users, products = data['users'], data['products']
+        return {
+            "users": data['totalUsers'],
+            "byRole": {role: count for role, count in users['by_role'].items() if count},
+            "products": data['totalProducts'],
+            "inStock": products['in_stock'],
+            "categories": sorted(products['categories'])
+        }
+    return {
+        "users": data['users']['total'],
+        "byRole": data['users']['by_role'],
+        "products": data['products']['total'],
+        "inStock": data['products']['in_stock'],
+        "categories": sorted(data['products']['by_category'])
+    }
+
+
+def status_only(body: Any) -> None:
+    """For responses whose bodies legitimately differ (e.g. Django's HTML 404 page)"""
+    return None
+
+
+class Scenario(NamedTuple):
+    """One request, described in the Flask app's terms"""
+    name: str
+    path: str
+    params: Tuple[Tuple[str, str], ...] = ()
+    normalize: Callable[[Any], Any] = normalize
+    # Known divergence between the apps; the test is expected to fail until it is fixed
+    divergence: Optional[str] = None
+
+    def flask_request(self) -> Tuple[str, str]:
+        return self.path, urlencode(self.params)
+
+    def django_request(self) -> Tuple[str, str]:
+        params = []
+        for key, value in self.params:
+            if key == 'fields':
+                value = ','.join(DJANGO_NAMES.get(field, field) for field in value.split(','))
+            params.append((DJANGO_NAMES.get(key, key), value))
+        return self.path.rstrip('/') + '/', urlencode(params)
+
+
+SCENARIOS = [
+    Scenario('users', '/api/users'),
+    Scenario('users-role', '/api/users', (('role', 'user'),)),
+    Scenario('users-role-case', '/api/users', (('role', 'Admin'),),
+             divergence="Flask matches role case-sensitively, Django does not"),
+    Scenario('users-limit', '/api/users', (('limit', '2'),)),
+    Scenario('users-limit-invalid', '/api/users', (('limit', 'abc'),)),
+    Scenario('users-limit-zero', '/api/users', (('limit', '0'),),
+             divergence="Flask treats limit=0 as no limit, Django returns nothing"),
+    Scenario('users-search', '/api/users', (('q', 'bo'),)),
+    Scenario('users-search-role', '/api/users', (('q', 'example'), ('role', 'user'), ('limit', '2'))),
+    Scenario('users-ids', '/api/users', (('ids', '3,1,99'),)),
+    Scenario('users-ids-invalid', '/api/users', (('ids', '1,x'),)),
+    Scenario('users-fields', '/api/users', (('fields', 'id,name'),)),
+    Scenario('users-fields-unknown', '/api/users', (('fields', 'id,password'),)),
+    Scenario('user', '/api/users/1'),
+    Scenario('user-fields', '/api/users/2', (('fields', 'email'),)),
+    Scenario('user-404', '/api/users/999'),
+    Scenario('products', '/api/products'),
+    Scenario('products-category', '/api/products', (('category', 'electronics'),)),
+    Scenario('products-in-stock', '/api/products', (('inStock', 'true'),)),
+    Scenario('products-category-in-stock', '/api/products', (('category', 'Education'), ('inStock', 'true'))),
+    Scenario('products-limit', '/api/products', (('limit', '1'),),
+             divergence="Django's product list has no limit parameter"),
+    Scenario('products-search', '/api/products', (('q', 'book'),)),
+    Scenario('products-ids', '/api/products', (('ids', '4,2'),)),
+    Scenario('products-fields', '/api/products', (('fields', 'id,inStock'),)),
+    Scenario('unknown-endpoint', '/api/nothing', normalize=status_only),
+    Scenario('stats', '/api/stats', normalize=normalize_stats),
+]
+
+
+def run(application: Callable, request: Tuple[str, str], scenario: Scenario) -> Tuple[Response, Any, float]:
+    """Call a scenario; returns the raw response, its normalized body and the latency in ms"""
+    path, query = request
+    start = time.perf_counter()
+    response = call(application, path, query)
+    elapsed = (time.perf_counter() - start) * 1000
+    return response, scenario.normalize(response.json()), elapsed
@@ -0,0 +1,47 @@
+"""
+Flask and Django apps must answer the same scenarios the same way
+"""
+import pytest
+
+import contract
+
+
+def scenario_params():
+    return [
+        pytest.param(scenario, id=scenario.name,
+                     marks=[pytest.mark.xfail(reason=scenario.divergence, strict=True)] if scenario.divergence else [])
+        for scenario in contract.SCENARIOS
+    ]
+
+
+@pytest.mark.parametrize('scenario', scenario_params())
+def test_same_response(apps, record_latency, scenario):
+    flask, flask_body, flask_ms = contract.run(apps['flask'], scenario.flask_request(), scenario)
+    django, django_body, django_ms = contract.run(apps['django'], scenario.django_request(), scenario)
+    record_latency(scenario.name, 'flask', flask_ms)
+    record_latency(scenario.name, 'django', django_ms)
+
+    assert flask.status == django.status
+    assert flask_body == django_body
+
+
+@pytest.mark.parametrize('stack', ['flask', 'django'])
+@pytest.mark.parametrize('scenario', [
+    scenario for scenario in contract.SCENARIOS
+    if scenario.normalize is contract.normalize and not scenario.divergence
+], ids=lambda scenario: scenario.name)
+def test_list_envelope(apps, stack, scenario):
+    """Successful list responses are internally consistent in both apps"""
+    request = scenario.flask_request() if stack == 'flask' else scenario.django_request()
+    response, body, _ = contract.run(apps[stack], request, scenario)
+    if response.status != 200 or not isinstance(body.get('data'), list):
+        pytest.skip('not a list response')
+    assert body['success'] is True
+    assert body['count'] == len(body['data'])
+    params = dict(scenario.params)
+    if 'limit' in params and params['limit'].lstrip('-').isdigit() and int(params['limit']) > 0:
+        assert len(body['data']) <= int(params['limit'])
+    if 'inStock' in params:
+        assert all(record['inStock'] for record in body['data'])
+    if 'category' in params:
+        assert all(record['category'].lower() == params['category'].lower() for record in body['data'])
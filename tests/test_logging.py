@@ -0,0 +1,58 @@
+"""
+The Django LOGGING setting must configure and write JSON lines
+"""
+import copy
+import io
+import json
+import logging
+import logging.config
+import logging.handlers
+import sys
+
+import pytest
+
+import contract
+
+
+@pytest.fixture
+def restore_loggers():
+    """Put back the handlers dictConfig replaces, so later tests see the original setup"""
+    names = ['django', 'access']
+    saved = {name: (logging.getLogger(name).handlers[:], logging.getLogger(name).level,
+                    logging.getLogger(name).propagate) for name in names}
+    yield
+    for name, (handlers, level, propagate) in saved.items():
+        logger = logging.getLogger(name)
+        for handler in logger.handlers:
+            if handler not in handlers:
+                handler.close()
+        logger.handlers[:] = handlers
+        logger.setLevel(level)
+        logger.propagate = propagate
+
+
+def test_django_logging_dictconfig(restore_loggers):
+    if contract.DJANGO_DIR not in sys.path:
+        sys.path.insert(0, contract.DJANGO_DIR)
+    from djangoapp import settings
+
+    # Python 3.12+ dictConfig needs 'handlers' for (and passes a queue to) QueueHandler classes
+    for name, handler_config in settings.LOGGING['handlers'].items():
+        if 'class' in handler_config:
+            handler_class = logging.config.BaseConfigurator({}).resolve(handler_config['class'])
+            assert not issubclass(handler_class, logging.handlers.QueueHandler), name
+
+    config = copy.deepcopy(settings.LOGGING)
+    stream = io.StringIO()
+    config['handlers']['console']['stream'] = stream
+    logging.config.dictConfig(config)
+
+    handler = logging.getLogger('access').handlers[0]
+    assert handler is logging.getLogger('django').handlers[0]
+    logging.getLogger('access').info('access', extra={'access': {"path": "/api/users/", "status": 200}})
+    logging.getLogger('django').warning('plain %s', 'message')
+    handler.close()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert lines[0]['path'] == '/api/users/' and lines[0]['status'] == 200
+    assert lines[1]['message'] == 'plain message' and lines[1]['level'] == 'WARNING'
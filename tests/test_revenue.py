@@ -0,0 +1,74 @@
+"""
+Flask /api/stats/revenue over the app's seed orders (2024-06-01 09:15, 14:40 and 2024-06-02 11:05)
+"""
+import pytest
+
+import contract
+
+
+def revenue(apps, query=''):
+    response = contract.call(apps['flask'], '/api/stats/revenue', query)
+    return response.status, response.json()
+
+
+def test_default_range_covers_every_order(apps):
+    status, body = revenue(apps)
+    assert status == 200
+    data = body['data']
+    assert data['granularity'] == 'day'
+    assert [bucket['start'] for bucket in data['buckets']] == ['2024-06-01T00:00:00Z', '2024-06-02T00:00:00Z']
+    assert data['totals']['count'] == 3
+    assert data['totals']['revenue'] == 1739.96
+    assert data['totals']['byStatus']['completed']['count'] == 2
+
+
+def test_hour_granularity(apps):
+    status, body = revenue(apps, 'granularity=hour')
+    assert status == 200
+    assert [bucket['start'] for bucket in body['data']['buckets']] == [
+        '2024-06-01T09:00:00Z', '2024-06-01T14:00:00Z', '2024-06-02T11:00:00Z'
+    ]
+
+
+def test_explicit_range_covers_overlapping_buckets(apps):
+    # from is rounded down to its bucket; the bucket starting at to is excluded
+    status, body = revenue(apps, 'granularity=hour&from=2024-06-01T09:30:00Z&to=2024-06-02T11:00:00Z')
+    assert status == 200
+    assert body['data']['totals']['count'] == 2
+    assert body['data']['totals']['revenue'] == 1039.97
+
+
+def test_epoch_seconds(apps):
+    # 2024-06-02T00:00:00Z
+    status, body = revenue(apps, 'from=1717286400')
+    assert status == 200
+    assert body['data']['totals']['count'] == 1
+
+
+@pytest.mark.parametrize('query', ['from=2030-01-01', 'to=1990-01-01'])
+def test_one_bound_outside_the_data_is_empty(apps, query):
+    status, body = revenue(apps, query)
+    assert status == 200
+    assert body['data']['buckets'] == []
+    assert body['data']['totals']['count'] == 0
+
+
+@pytest.mark.parametrize('query', [
+    'granularity=week',
+    'from=yesterday',
+    'from=nan',
+    'to=inf',
+    'from=-inf',
+    'from=1e20',
+    'from=2024-06-02&to=2024-06-01',
+])
+def test_bad_input(apps, query):
+    status, body = revenue(apps, query)
+    assert status == 400
+    assert body['success'] is False
+
+
+@pytest.mark.parametrize('query', ['from=nan', 'to=1e20'])
+def test_orders_reject_non_finite_range(apps, query):
+    response = contract.call(apps['flask'], '/api/orders', query)
+    assert response.status == 400